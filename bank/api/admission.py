@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+# admitted/rate_limited count write requests at the token bucket; in_flight_* count transfers at the per-account cap.
+STATS = ['admitted', 'rate_limited', 'in_flight_admitted', 'in_flight_rejected']
+
+
+def record(stat):
+    key = f'admission:stats:{stat}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    values = cache.get_many([f'admission:stats:{stat}' for stat in STATS])
+    return {stat: values.get(f'admission:stats:{stat}', 0) for stat in STATS}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Per-client token bucket for write requests, kept in the Django cache.
+
+    Each auth token (or client IP) refills ADMISSION_RATE tokens per second up to ADMISSION_BURST;
+    a write spends one. Reads are not limited. Concurrent requests from one client may race on the bucket and
+    overshoot slightly, which is fine for load shedding.
+    """
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        rate, burst = settings.ADMISSION_RATE, settings.ADMISSION_BURST
+        key = f'admission:bucket:{request.auth.key if request.auth else self.get_ident(request)}'
+        now = time.time()
+        tokens, updated_at = cache.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        if tokens < 1:
+            self.retry_after = (1 - tokens) / rate
+            record('rate_limited')
+            return False
+        cache.set(key, (tokens - 1, now), timeout=max(1, int(burst / rate) + 1))
+        record('admitted')
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class AccountConcurrencyLimit:
+    """Caps concurrent transfers per sender so retry storms fail fast instead of queueing on row locks."""
+
+    def __init__(self, user):
+        self.key = f'admission:in_flight:{user.pk}'
+        self.acquired = False
+
+    def __enter__(self):
+        timeout = settings.ADMISSION_IN_FLIGHT_TIMEOUT
+        cache.add(self.key, 0, timeout=timeout)
+        try:
+            in_flight = cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, 1, timeout=timeout)
+            in_flight = 1
+        # incr keeps the expiry set by add; renew it so the counter outlives the transfers it is counting.
+        cache.touch(self.key, timeout)
+        self.acquired = True
+        if in_flight > settings.ADMISSION_MAX_IN_FLIGHT:
+            self.release()
+            record('in_flight_rejected')
+            raise Throttled(wait=settings.ADMISSION_RETRY_AFTER, detail='Too many transfers in progress.')
+        record('in_flight_admitted')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def release(self):
+        if self.acquired:
+            self.acquired = False
+            try:
+                in_flight = cache.decr(self.key)
+            except ValueError:
+                return
+            if in_flight < 0:
+                # The counter expired and was recreated while this transfer ran.
+                cache.set(self.key, 0, timeout=settings.ADMISSION_IN_FLIGHT_TIMEOUT)
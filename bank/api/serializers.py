@@ -1,6 +1,18 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
-from bank.models import Transaction
+from bank.models import ScheduledTransfer, Transaction
+
+
+class RegisterBatchSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.DictField(child=serializers.CharField(allow_blank=True)),
+        allow_empty=False,
+        max_length=settings.REGISTER_BATCH_MAX_SIZE,
+    )
 
 
 class TransactionQuerySerializer(serializers.Serializer):
@@ -15,7 +27,29 @@ class TransactionQuerySerializer(serializers.Serializer):
         return data
 
 
+class TransactionSummaryQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=['day', 'month'], default='day')
+    date_from = serializers.DateField(required=False, allow_null=True)
+    date_to = serializers.DateField(required=False, allow_null=True)
+
+    def validate(self, data):
+        date_from = data.get('date_from')
+        date_to = data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError("date_from cannot be later than date_to")
+        return data
+
+
+class TransactionSummarySerializer(serializers.Serializer):
+    period = serializers.DateField()
+    credit = serializers.DecimalField(max_digits=14, decimal_places=2)
+    debit = serializers.DecimalField(max_digits=14, decimal_places=2)
+    fee = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
 class TransactionSerializer(serializers.ModelSerializer):
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
     class Meta:
         model = Transaction
         fields = ['amount', 'transaction_type', 'created_at']
@@ -35,3 +69,30 @@ class TransferSerializer(serializers.Serializer):
         if not value.isdigit() or len(value) != 10:
             raise serializers.ValidationError("Invalid account number")
         return value
+
+
+class ScheduledTransferSerializer(serializers.ModelSerializer):
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        model = ScheduledTransfer
+        fields = [
+            'id', 'receiver_account_number', 'amount', 'interval', 'starts_at',
+            'next_run_at', 'is_active', 'last_run_at', 'last_error',
+        ]
+        read_only_fields = ['id', 'next_run_at', 'is_active', 'last_run_at', 'last_error']
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Amount must be positive")
+        return value
+
+    def validate_receiver_account_number(self, value):
+        if not value.isdigit() or len(value) != 10:
+            raise serializers.ValidationError("Invalid account number")
+        return value
+
+    def validate_starts_at(self, value):
+        if value < timezone.now() - timedelta(seconds=settings.SCHEDULED_TRANSFER_START_GRACE_SECONDS):
+            raise serializers.ValidationError("Start time is in the past")
+        return value
@@ -0,0 +1,81 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from bank.api.serializers import TransactionSerializer
+from bank.models import BankAccount, Transaction
+from bank.notifications import notifier
+
+
+def release_connection():
+    """Close this thread's database connection, unless it is inside a transaction (as in a test case)."""
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+def fetch_transactions(account_id, last_event_id):
+    """Next batch of the account's transactions. The connection is released so idle streams don't hold one."""
+    try:
+        return list(
+            Transaction.objects.filter(account_id=account_id, id__gt=last_event_id)
+            .order_by('id')[:settings.TRANSACTION_STREAM_BATCH_SIZE]
+        )
+    finally:
+        release_connection()
+
+
+class TransactionStreamView(View):
+    """
+    Pushes new transactions of the authenticated account as Server-Sent Events. Serve it through the ASGI app.
+
+    Under ASGI the database connection lives until the response ends, so an open stream only holds one while it
+    queries; new rows are signalled over the notifier's single LISTEN connection per process.
+    """
+
+    async def get(self, request):
+        try:
+            authenticated = await sync_to_async(TokenAuthentication().authenticate)(request)
+        except exceptions.AuthenticationFailed as e:
+            return JsonResponse({'detail': str(e.detail)}, status=401)
+        if authenticated is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        try:
+            account = await BankAccount.objects.aget(user=authenticated[0])
+        except BankAccount.DoesNotExist:
+            return JsonResponse({'detail': 'Bank account not found'}, status=400)
+
+        last_event_id = request.headers.get('Last-Event-ID', request.GET.get('last_event_id'))
+        if last_event_id is None:
+            latest = await account.transactions.order_by('-id').afirst()
+            last_event_id = latest.pk if latest else 0
+        elif not last_event_id.isdigit():
+            return JsonResponse({'detail': 'Invalid Last-Event-ID'}, status=400)
+
+        await sync_to_async(release_connection)()
+        response = StreamingHttpResponse(self.events(account.pk, int(last_event_id)), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def events(self, account_id, last_event_id):
+        subscription = await notifier.subscribe(account_id)
+        try:
+            yield f'retry: {settings.TRANSACTION_STREAM_POLL_INTERVAL * 1000}\n\n'
+            while True:
+                # Clear before querying so a notification racing the query triggers another round.
+                subscription.clear()
+                for transaction in await sync_to_async(fetch_transactions)(account_id, last_event_id):
+                    last_event_id = transaction.pk
+                    data = json.dumps(TransactionSerializer(transaction).data)
+                    yield f'id: {transaction.pk}\nevent: transaction\ndata: {data}\n\n'
+                if not await subscription.wait(settings.TRANSACTION_STREAM_KEEPALIVE):
+                    yield ': keepalive\n\n'
+        finally:
+            subscription.close()
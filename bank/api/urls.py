@@ -1,11 +1,22 @@
 from django.urls import path
-from .views import RegisterView, LoginView, BalanceView, TransactionListView, TransferView
+
+from .streams import TransactionStreamView
+from .views import (
+    RegisterView, RegisterBatchView, LoginView, BalanceView, TransactionListView, TransactionSummaryView, TransferView,
+    ScheduledTransferView, ScheduledTransferDetailView, AdmissionStatsView,
+)
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
+    path('register/batch/', RegisterBatchView.as_view(), name='register-batch'),
     path('login/', LoginView.as_view(), name='login'),
     path('balance/', BalanceView.as_view(), name='balance'),
     path('transactions/', TransactionListView.as_view(), name='transactions'),
+    path('transactions/stream/', TransactionStreamView.as_view(), name='transactions-stream'),
+    path('transactions/summary/', TransactionSummaryView.as_view(), name='transactions-summary'),
     path('transfer/', TransferView.as_view(), name='transfer'),
+    path('admission/stats/', AdmissionStatsView.as_view(), name='admission-stats'),
+    path('scheduled-transfers/', ScheduledTransferView.as_view(), name='scheduled-transfers'),
+    path('scheduled-transfers/<int:pk>/', ScheduledTransferDetailView.as_view(), name='scheduled-transfer-detail'),
 
 ]
@@ -1,9 +1,23 @@
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 
-from bank.api.serializers import TransactionQuerySerializer, TransactionSerializer, TransferSerializer
-from bank.services import UserService, UserServiceException, BankService, BankServiceException
+from bank.api.admission import AccountConcurrencyLimit, TokenBucketThrottle, get_stats
+from bank.api.serializers import (
+    RegisterBatchSerializer,
+    ScheduledTransferSerializer,
+    TransactionQuerySerializer,
+    TransactionSerializer,
+    TransactionSummaryQuerySerializer,
+    TransactionSummarySerializer,
+    TransferSerializer,
+)
+from bank.models import ScheduledTransfer
+from bank.services import (
+    UserService, UserServiceException, UserServiceBusyException, BankService, BankServiceException
+)
 
 
 class RegisterView(APIView):
@@ -20,6 +34,17 @@ class RegisterView(APIView):
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RegisterBatchView(APIView):
+    permission_classes = [IsAdminUser]
+    throttle_classes = [TokenBucketThrottle]
+
+    def post(self, request):
+        serializer = RegisterBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        users, errors = UserService.register_many(serializer.validated_data['users'])
+        return Response({'created': len(users), 'errors': errors}, status=status.HTTP_201_CREATED)
+
+
 class LoginView(APIView):
     authentication_classes = []
     permission_classes = []
@@ -30,6 +55,12 @@ class LoginView(APIView):
             password = request.data.get('password')
             token = UserService.login(email, password)
             return Response({'token': token.key}, status=status.HTTP_200_OK)
+        except UserServiceBusyException as e:
+            return Response(
+                {'detail': str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(settings.LOGIN_RETRY_AFTER)},
+            )
         except UserServiceException as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -61,16 +92,71 @@ class TransactionListView(APIView):
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TransactionSummaryView(APIView):
+    def get(self, request):
+        serializer = TransactionSummaryQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        summary = BankService.get_summary(request.user, **serializer.validated_data)
+        return Response({'summary': TransactionSummarySerializer(summary, many=True).data}, status=status.HTTP_200_OK)
+
+
 class TransferView(APIView):
+    throttle_classes = [TokenBucketThrottle]
+
     def post(self, request):
         try:
             serializer = TransferSerializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            BankService.transfer(
-                sender=request.user,
-                receiver_account_number=serializer.validated_data['receiver_account_number'],
-                amount=serializer.validated_data['amount']
-            )
+            with AccountConcurrencyLimit(request.user):
+                BankService.transfer(
+                    sender=request.user,
+                    receiver_account_number=serializer.validated_data['receiver_account_number'],
+                    amount=serializer.validated_data['amount']
+                )
             return Response({'message': 'Transfer successful'}, status=status.HTTP_200_OK)
         except BankServiceException as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ScheduledTransferView(APIView):
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request):
+        scheduled_transfers = ScheduledTransfer.objects.filter(sender__user=request.user).order_by('next_run_at')
+        data = ScheduledTransferSerializer(scheduled_transfers, many=True).data
+        return Response({'scheduled_transfers': data}, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        try:
+            serializer = ScheduledTransferSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            scheduled_transfer = BankService.schedule_transfer(sender=request.user, **serializer.validated_data)
+            return Response(ScheduledTransferSerializer(scheduled_transfer).data, status=status.HTTP_201_CREATED)
+        except BankServiceException as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ScheduledTransferDetailView(APIView):
+    throttle_classes = [TokenBucketThrottle]
+
+    def delete(self, request, pk):
+        try:
+            scheduled_transfer = BankService.cancel_scheduled_transfer(request.user, pk)
+            return Response(ScheduledTransferSerializer(scheduled_transfer).data, status=status.HTTP_200_OK)
+        except BankServiceException as e:
+            return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+
+class AdmissionStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        data = {
+            'counters': get_stats(),
+            'limits': {
+                'rate': settings.ADMISSION_RATE,
+                'burst': settings.ADMISSION_BURST,
+                'max_in_flight': settings.ADMISSION_MAX_IN_FLIGHT,
+            },
+        }
+        return Response(data, status=status.HTTP_200_OK)
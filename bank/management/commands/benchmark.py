@@ -0,0 +1,55 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from rest_framework.authtoken.admin import User
+
+from bank.models import BankAccount, Transaction
+from bank.services import BankService
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the transfer and transaction aggregation paths. All data is rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=100)
+        parser.add_argument('--transfers', type=int, default=1000)
+        parser.add_argument('--aggregations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            accounts = self.create_accounts(options['accounts'])
+            self.bench_transfers(accounts, options['transfers'])
+            self.bench_aggregations(options['aggregations'])
+            transaction.set_rollback(True)
+
+    def create_accounts(self, count):
+        users = User.objects.bulk_create(
+            User(username=f'bench-{i}@example.com', email=f'bench-{i}@example.com') for i in range(count)
+        )
+        return BankAccount.objects.bulk_create(
+            BankAccount(user=user, account_number=f'9{i:09d}', balance=Decimal('10000.00'))
+            for i, user in enumerate(users)
+        )
+
+    def bench_transfers(self, accounts, count):
+        rng = random.Random(0)
+        started = time.perf_counter()
+        for _ in range(count):
+            sender, receiver = rng.sample(accounts, 2)
+            amount = Decimal(rng.randint(1, 5000)) / 100
+            BankService.transfer(sender.user, receiver.account_number, amount)
+        self.report('transfer', count, time.perf_counter() - started)
+
+    def bench_aggregations(self, count):
+        started = time.perf_counter()
+        for _ in range(count):
+            list(Transaction.objects.values('account_id', 'transaction_type').annotate(total=Sum('amount')))
+            BankAccount.objects.aggregate(total=Sum('balance'))
+        self.report('aggregation', count, time.perf_counter() - started)
+
+    def report(self, name, count, elapsed):
+        self.stdout.write(f'{name}: {count} runs in {elapsed:.3f}s ({count / elapsed:.1f}/s)')
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bank.passwords import ConfigurablePBKDF2PasswordHasher
+
+
+class Command(BaseCommand):
+    help = 'Time the PBKDF2 password hasher and suggest PASSWORD_PBKDF2_ITERATIONS for a target hashing time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=100, help='Desired time per password check.')
+        parser.add_argument('--samples', type=int, default=5)
+
+    def handle(self, *args, **options):
+        hasher = ConfigurablePBKDF2PasswordHasher()
+        iterations = settings.PASSWORD_PBKDF2_ITERATIONS
+        salt = hasher.salt()
+
+        started = time.perf_counter()
+        for _ in range(options['samples']):
+            hasher.encode('benchmark-password', salt, iterations)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / options['samples']
+
+        suggested = max(1, round(iterations * options['target_ms'] / elapsed_ms, -3))
+        self.stdout.write(f'{iterations} iterations: {elapsed_ms:.1f}ms per hash')
+        self.stdout.write(f'PASSWORD_PBKDF2_ITERATIONS = {int(suggested)}  # ~{options["target_ms"]:.0f}ms')
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+
+from bank.models import BankAccount, Transaction, TransactionRollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the daily transaction rollups from the Transaction history, one account id range per '
+        'transaction so concurrent transfers only wait for the range they touch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--range-size', type=int, default=1000, help='Number of account ids per transaction.')
+        parser.add_argument('--retries', type=int, default=3, help='Attempts per range after a deadlock or lock timeout.')
+
+    def handle(self, *args, **options):
+        bounds = BankAccount.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        created = 0
+        if bounds['first'] is not None:
+            for start_id in range(bounds['first'], bounds['last'] + 1, options['range_size']):
+                created += self.rebuild_range_with_retries(start_id, start_id + options['range_size'], options['retries'])
+        self.stdout.write(f'Rebuilt {created} rollups')
+
+    def rebuild_range_with_retries(self, start_id, end_id, retries):
+        attempt = 0
+        while True:
+            try:
+                return self.rebuild_range(start_id, end_id)
+            except OperationalError as e:
+                attempt += 1
+                if attempt > retries:
+                    raise
+                self.stderr.write(f'Accounts {start_id}-{end_id - 1} failed ({e}), retrying')
+
+    @transaction.atomic
+    def rebuild_range(self, start_id, end_id):
+        # Transfers lock their accounts before touching rollups, so holding the range's account locks keeps them
+        # from updating rows while they are deleted and recomputed. Locks are taken in pk order, as settle does.
+        list(
+            BankAccount.objects.select_for_update()
+            .filter(pk__gte=start_id, pk__lt=end_id).order_by('pk').values_list('pk')
+        )
+        TransactionRollup.objects.filter(account_id__gte=start_id, account_id__lt=end_id).delete()
+        rows = (
+            Transaction.objects
+            .filter(account_id__gte=start_id, account_id__lt=end_id)
+            .annotate(date=TruncDate('created_at'))
+            .values('account_id', 'date', 'transaction_type')
+            .annotate(total=Sum('amount'), fee_total=Sum('fee'), count=Count('id'))
+            .order_by()
+        )
+
+        rollups = []
+        for row in rows.iterator():
+            rollups.append(TransactionRollup(
+                account_id=row['account_id'], date=row['date'], rollup_type=row['transaction_type'],
+                total=row['total'], count=row['count'],
+            ))
+            if row['transaction_type'] == 'debit':
+                rollups.append(TransactionRollup(
+                    account_id=row['account_id'], date=row['date'], rollup_type='fee',
+                    total=row['fee_total'], count=row['count'],
+                ))
+        return len(TransactionRollup.objects.bulk_create(rollups))
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from bank.management.workers import make_pool
+from bank.models import BankAccount
+from bank.services import BankService
+
+
+def reconcile_range(bounds):
+    start_id, end_id, full = bounds
+    return BankService.reconcile_accounts(start_id, end_id, full=full)
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that every account balance equals its welcome bonus plus credits minus debits. '
+        'Discrepancies are written to stdout as JSON lines, followed by a summary line.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of worker processes, 0 to run inline.')
+        parser.add_argument('--range-size', type=int, default=10000, help='Number of account ids per work unit.')
+        parser.add_argument('--full', action='store_true', help='Ignore checkpoints and rescan every account.')
+
+    def handle(self, *args, **options):
+        bounds = BankAccount.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        ranges = []
+        if bounds['first'] is not None:
+            ranges = [
+                (start_id, start_id + options['range_size'], options['full'])
+                for start_id in range(bounds['first'], bounds['last'] + 1, options['range_size'])
+            ]
+
+        if options['workers']:
+            with make_pool(options['workers']) as executor:
+                results = executor.map(reconcile_range, ranges)
+                checked, discrepancies = self.report(results)
+        else:
+            checked, discrepancies = self.report(map(reconcile_range, ranges))
+
+        self.stdout.write(json.dumps({'accounts_checked': checked, 'discrepancies': discrepancies}))
+        if discrepancies:
+            raise CommandError(f'{discrepancies} accounts do not reconcile')
+
+    def report(self, results):
+        total_checked = 0
+        total_discrepancies = 0
+        for checked, discrepancies in results:
+            total_checked += checked
+            total_discrepancies += len(discrepancies)
+            for discrepancy in discrepancies:
+                self.stdout.write(json.dumps(discrepancy))
+        return total_checked, total_discrepancies
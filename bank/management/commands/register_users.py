@@ -0,0 +1,47 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from bank.services import UserService
+
+
+class Command(BaseCommand):
+    help = (
+        'Register users and their bank accounts from a CSV file with "email" and "password" columns. '
+        'Rows that cannot be registered are written to stdout as JSON lines.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the CSV file, or - to read stdin.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.register(csv.DictReader(sys.stdin), options['batch_size'])
+        else:
+            with open(options['path'], newline='') as f:
+                self.register(csv.DictReader(f), options['batch_size'])
+
+    def register(self, reader, batch_size):
+        created = 0
+        failed = 0
+        offset = 0
+        batch = []
+        for row in reader:
+            batch.append(row)
+            if len(batch) == batch_size:
+                users, errors = self.register_batch(batch, offset)
+                created, failed, offset = created + users, failed + errors, offset + len(batch)
+                batch = []
+        if batch:
+            users, errors = self.register_batch(batch, offset)
+            created, failed = created + users, failed + errors
+        self.stdout.write(json.dumps({'created': created, 'errors': failed}))
+
+    def register_batch(self, batch, offset):
+        users, errors = UserService.register_many(batch)
+        for error in errors:
+            self.stdout.write(json.dumps({**error, 'row': error['row'] + offset}))
+        return len(users), len(errors)
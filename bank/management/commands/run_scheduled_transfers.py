@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+
+from bank.management.workers import make_pool
+from bank.services import BankService
+
+
+def run_until_caught_up(chunk_size, retries=3):
+    """Claim chunks until none are due. A chunk that fails to claim, e.g. on a deadlock, is retried."""
+    processed = failures = 0
+    while True:
+        try:
+            claimed = BankService.run_scheduled_transfers(chunk_size)
+        except OperationalError:
+            failures += 1
+            if failures > retries:
+                raise
+            continue
+        if not claimed:
+            return processed
+        failures = 0
+        processed += claimed
+
+
+class Command(BaseCommand):
+    help = 'Execute due scheduled transfers, including runs missed during downtime.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of worker processes, 0 to run inline.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of schedules claimed per transaction.')
+
+    def handle(self, *args, **options):
+        if options['workers']:
+            with make_pool(options['workers']) as executor:
+                processed = sum(executor.map(run_until_caught_up, [options['chunk_size']] * options['workers']))
+        else:
+            processed = run_until_caught_up(options['chunk_size'])
+        self.stdout.write(f'Processed {processed} scheduled transfer runs')
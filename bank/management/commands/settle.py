@@ -0,0 +1,35 @@
+import json
+import sys
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bank.services import BankService, BankServiceException
+
+
+class Command(BaseCommand):
+    help = (
+        'Settle a batch of transfers by their net effect per account. The input is a JSON list of '
+        '{"sender_account_number", "receiver_account_number", "amount"} objects.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the JSON batch, or - to read stdin.')
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                instructions = json.load(sys.stdin, parse_float=Decimal)
+            else:
+                with open(options['path']) as f:
+                    instructions = json.load(f, parse_float=Decimal)
+        except json.JSONDecodeError as e:
+            raise CommandError(f'Invalid JSON: {e}')
+        if not isinstance(instructions, list):
+            raise CommandError('The batch must be a JSON list of instructions')
+
+        try:
+            settled = BankService.settle(instructions)
+        except BankServiceException as e:
+            raise CommandError(f'Settlement failed: {e}')
+        self.stdout.write(f'Settled {settled} transfers')
@@ -0,0 +1,18 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+
+def make_pool(workers):
+    """
+    A process pool that behaves the same whatever the platform's default start method is.
+
+    Workers come from a forkserver, so they never inherit the parent's database connections or threads, and each
+    one runs django.setup() before taking work.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('forkserver'),
+        initializer=django.setup,
+    )
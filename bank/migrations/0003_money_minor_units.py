@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Round
+
+import bank.money
+
+DECIMAL = models.DecimalField(max_digits=14, decimal_places=2)
+BIGINT = models.BigIntegerField()
+
+
+def to_minor_units(apps, schema_editor):
+    BankAccount = apps.get_model('bank', 'BankAccount')
+    Transaction = apps.get_model('bank', 'Transaction')
+    BankAccount.objects.update(balance_minor=Cast(Round(F('balance') * 100), BIGINT))
+    Transaction.objects.update(amount_minor=Cast(Round(F('amount') * 100), BIGINT))
+
+
+def from_minor_units(apps, schema_editor):
+    BankAccount = apps.get_model('bank', 'BankAccount')
+    Transaction = apps.get_model('bank', 'Transaction')
+    BankAccount.objects.update(balance=F('balance_minor') * Value(Decimal('0.01'), DECIMAL))
+    Transaction.objects.update(amount=F('amount_minor') * Value(Decimal('0.01'), DECIMAL))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bank", "0002_transaction"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bankaccount",
+            name="balance_minor",
+            field=bank.money.MoneyField(default=Decimal("0.00")),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="amount_minor",
+            field=bank.money.MoneyField(default=Decimal("0.00")),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(to_minor_units, from_minor_units),
+        migrations.RemoveField(
+            model_name="bankaccount",
+            name="balance",
+        ),
+        migrations.RemoveField(
+            model_name="transaction",
+            name="amount",
+        ),
+        migrations.RenameField(
+            model_name="bankaccount",
+            old_name="balance_minor",
+            new_name="balance",
+        ),
+        migrations.RenameField(
+            model_name="transaction",
+            old_name="amount_minor",
+            new_name="amount",
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:41
+
+import bank.money
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0003_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='fee',
+            field=bank.money.MoneyField(default=Decimal('0.00')),
+        ),
+        migrations.CreateModel(
+            name='TransactionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('rollup_type', models.CharField(choices=[('credit', 'Credit'), ('debit', 'Debit'), ('fee', 'Fee')], max_length=10)),
+                ('total', bank.money.MoneyField(default=Decimal('0.00'))),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='bank.bankaccount')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('account', 'date', 'rollup_type'), name='unique_rollup_per_day')],
+            },
+        ),
+    ]
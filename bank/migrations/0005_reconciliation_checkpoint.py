@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:42
+
+import bank.money
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0004_transaction_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('credit_total', bank.money.MoneyField(default=Decimal('0.00'))),
+                ('debit_total', bank.money.MoneyField(default=Decimal('0.00'))),
+                ('reconciled_at', models.DateTimeField(auto_now=True)),
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reconciliation_checkpoint', to='bank.bankaccount')),
+            ],
+        ),
+    ]
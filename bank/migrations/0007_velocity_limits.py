@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:51
+
+import bank.money
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0006_scheduled_transfer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankaccount',
+            name='tier',
+            field=models.CharField(default='standard', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='VelocityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('total', bank.money.MoneyField(default=Decimal('0.00'))),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='velocity_buckets', to='bank.bankaccount')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('account', 'slot'), name='unique_velocity_slot')],
+            },
+        ),
+    ]
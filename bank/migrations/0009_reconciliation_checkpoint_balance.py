@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:09
+
+import bank.money
+from decimal import Decimal
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0008_transaction_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reconciliationcheckpoint',
+            name='balance',
+            field=bank.money.MoneyField(default=Decimal('0.00')),
+        ),
+    ]
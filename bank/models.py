@@ -1,11 +1,16 @@
+from decimal import Decimal
+
 from django.db import models
 from rest_framework.authtoken.admin import User
 
+from bank.money import MoneyField
+
 
 class BankAccount(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='bank_account')
     account_number = models.CharField(max_length=10, unique=True)
-    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    balance = MoneyField(default=Decimal('0.00'))
+    tier = models.CharField(max_length=20, default='standard')
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -18,9 +23,92 @@ class Transaction(models.Model):
         ('debit', 'Debit'),
     )
     account = models.ForeignKey(BankAccount, on_delete=models.PROTECT, related_name='transactions')
-    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    amount = MoneyField()
+    fee = MoneyField(default=Decimal('0.00'))
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='transaction_created_at'),
+        ]
+
     def __str__(self):
         return f"{self.account} - {self.transaction_type} - {self.amount}"
+
+
+class TransactionRollup(models.Model):
+    ROLLUP_TYPES = (
+        ('credit', 'Credit'),
+        ('debit', 'Debit'),
+        ('fee', 'Fee'),
+    )
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='rollups')
+    date = models.DateField()
+    rollup_type = models.CharField(max_length=10, choices=ROLLUP_TYPES)
+    total = MoneyField(default=Decimal('0.00'))
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date', 'rollup_type'], name='unique_rollup_per_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} - {self.date} - {self.rollup_type} - {self.total}"
+
+
+class ReconciliationCheckpoint(models.Model):
+    account = models.OneToOneField(BankAccount, on_delete=models.CASCADE, related_name='reconciliation_checkpoint')
+    last_transaction_id = models.BigIntegerField(default=0)
+    balance = MoneyField(default=Decimal('0.00'))
+    credit_total = MoneyField(default=Decimal('0.00'))
+    debit_total = MoneyField(default=Decimal('0.00'))
+    reconciled_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.account_id} - {self.last_transaction_id}"
+
+
+class ScheduledTransfer(models.Model):
+    INTERVALS = (
+        ('once', 'Once'),
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    )
+    sender = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='scheduled_transfers')
+    receiver_account_number = models.CharField(max_length=10)
+    amount = MoneyField()
+    interval = models.CharField(max_length=10, choices=INTERVALS)
+    starts_at = models.DateTimeField()
+    next_run_at = models.DateTimeField()
+    run_count = models.PositiveIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_run_at'], condition=models.Q(is_active=True), name='scheduled_transfer_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.sender} -> {self.receiver_account_number} - {self.amount} {self.interval}"
+
+
+class VelocityBucket(models.Model):
+    """One slot of an account's ring of outgoing-amount counters; ``bucket`` is the time bucket it currently holds."""
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='velocity_buckets')
+    slot = models.PositiveIntegerField()
+    bucket = models.BigIntegerField()
+    total = MoneyField(default=Decimal('0.00'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'slot'], name='unique_velocity_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} - {self.bucket} - {self.total}"
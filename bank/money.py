@@ -0,0 +1,49 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import models
+
+CENT = Decimal('0.01')
+MINOR_UNITS = 100
+# Largest amount the API accepts (12 digits, 2 of them decimals), in cents.
+MAX_AMOUNT_MINOR = 10 ** 12 - 1
+
+
+def to_minor_units(amount):
+    """Convert a decimal amount to integer cents, rounding half up."""
+    return int(Decimal(amount).quantize(CENT, rounding=ROUND_HALF_UP) * MINOR_UNITS)
+
+
+def from_minor_units(value):
+    """Convert integer cents back to a two-place Decimal."""
+    return (Decimal(value) / MINOR_UNITS).quantize(CENT)
+
+
+def apply_rate(value, rate):
+    """Multiply integer cents by a Decimal rate with exact integer math, rounding half up."""
+    numerator, denominator = rate.as_integer_ratio()
+    return (2 * value * numerator + denominator) // (2 * denominator)
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Stores money as a BIGINT number of cents and exposes it as a Decimal.
+
+    Query expressions that combine the column with plain integers (e.g. ``F('balance') - 500``)
+    operate on cents.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return from_minor_units(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        return Decimal(str(value)).quantize(CENT)
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return value
+        return to_minor_units(value)
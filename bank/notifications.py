@@ -0,0 +1,107 @@
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, connections
+
+CHANNEL = 'bank_transactions'
+
+
+def notify_transactions(*account_ids):
+    """
+    Announce new transactions for the given accounts. Postgres delivers the notifications on commit.
+
+    One row per account, so batches of any size stay within Postgres' limit on target-list entries.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, id::text) FROM unnest(%s::bigint[]) AS id', [CHANNEL, list(account_ids)]
+        )
+
+
+class Subscription:
+    def __init__(self, notifier, account_id):
+        self.notifier = notifier
+        self.account_id = account_id
+        self.event = asyncio.Event()
+
+    def clear(self):
+        self.event.clear()
+
+    async def wait(self, timeout):
+        """Wait until a notification arrives for the account, or until the timeout. Returns True if notified."""
+        if not self.notifier.listening:
+            await asyncio.sleep(min(timeout, settings.TRANSACTION_STREAM_POLL_INTERVAL))
+            return True
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def close(self):
+        self.notifier.unsubscribe(self)
+
+
+class TransactionNotifier:
+    """
+    Fans out Postgres notifications to the SSE streams of this process over a single LISTEN connection.
+
+    Other databases have no LISTEN, so subscriptions fall back to polling.
+    """
+
+    def __init__(self):
+        self.subscriptions = defaultdict(set)
+        self.listener = None
+        self.fileno = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def listening(self):
+        return self.listener is not None
+
+    async def subscribe(self, account_id):
+        async with self.lock:
+            if self.listener is None and connection.vendor == 'postgresql':
+                self.listener = await sync_to_async(self.connect, thread_sensitive=False)()
+                self.fileno = self.listener.connection.fileno()
+                asyncio.get_running_loop().add_reader(self.fileno, self.dispatch)
+        subscription = Subscription(self, account_id)
+        self.subscriptions[account_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self.subscriptions.get(subscription.account_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[subscription.account_id]
+
+    @staticmethod
+    def connect():
+        wrapper = connections.create_connection('default')
+        wrapper.ensure_connection()
+        wrapper.set_autocommit(True)
+        with wrapper.connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        return wrapper
+
+    def dispatch(self):
+        listener = self.listener.connection
+        try:
+            listener.poll()
+        except self.listener.Database.Error:
+            # Lost the listener: streams fall back to polling until a new subscription reconnects.
+            asyncio.get_running_loop().remove_reader(self.fileno)
+            self.listener = None
+            return
+        while listener.notifies:
+            notify = listener.notifies.pop(0)
+            for subscription in self.subscriptions.get(int(notify.payload), ()):
+                subscription.event.set()
+
+
+notifier = TransactionNotifier()
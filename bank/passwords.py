@@ -0,0 +1,132 @@
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from bank.management.workers import make_pool
+
+
+class ConfigurablePBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 with the iteration count taken from settings.PASSWORD_PBKDF2_ITERATIONS."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class PasswordVerifierBusy(Exception):
+    pass
+
+
+def check_password(password, encoded):
+    """
+    Verify a password against its stored hash, returning ``(is_correct, new_encoded)``.
+
+    ``new_encoded`` is a fresh hash when the stored one uses an outdated hasher or cost. Without a stored hash,
+    a password is still hashed so unknown users take as long as known ones.
+    """
+    if encoded is None:
+        hashers.make_password(password)
+        return False, None
+    is_correct, must_update = hashers.verify_password(password, encoded)
+    if is_correct and must_update:
+        return True, hashers.make_password(password)
+    return is_correct, None
+
+
+class WorkerPool:
+    """
+    Runs calls in a process pool, or inline without workers.
+
+    A pool broken by a dead worker is replaced and the call retried once; if it breaks again, BrokenProcessPool
+    propagates and the next call starts from a fresh pool.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = make_pool(workers) if workers else None
+        self.lock = threading.Lock()
+
+    def call(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        return self.retrying(lambda executor: executor.submit(fn, *args).result())
+
+    def map(self, fn, items, chunksize=1):
+        if self.executor is None:
+            return [fn(item) for item in items]
+        return self.retrying(lambda executor: list(executor.map(fn, items, chunksize=chunksize)))
+
+    def retrying(self, work):
+        executor = self.executor
+        try:
+            return work(executor)
+        except BrokenProcessPool:
+            executor = self.replace(executor)
+        try:
+            return work(executor)
+        except BrokenProcessPool:
+            self.replace(executor)
+            raise
+
+    def replace(self, broken):
+        with self.lock:
+            # Concurrent callers may all see the same broken pool; only the first replaces it.
+            if self.executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = make_pool(self.workers)
+            return self.executor
+
+
+class PasswordVerifier(WorkerPool):
+    """
+    Runs check_password in a process pool so hashing does not hold request threads or the GIL.
+
+    At most ``max_pending`` checks may be queued or running; further requests are refused with
+    PasswordVerifierBusy instead of waiting. With no workers the check runs inline under the same limit.
+    A check whose pool keeps breaking is refused with PasswordVerifierBusy too.
+    """
+
+    def __init__(self, workers, max_pending):
+        super().__init__(workers)
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def check(self, password, encoded):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordVerifierBusy()
+        try:
+            return self.call(check_password, password, encoded)
+        except BrokenProcessPool:
+            raise PasswordVerifierBusy()
+        finally:
+            self.slots.release()
+
+
+class PasswordHasherPool(WorkerPool):
+    """Hashes passwords for bulk imports in its own process pool, so imports never take login check capacity."""
+
+    def hash_many(self, passwords):
+        return self.map(hashers.make_password, passwords, chunksize=64)
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+_hasher_pool = None
+_hasher_pool_lock = threading.Lock()
+
+
+def get_verifier():
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = PasswordVerifier(settings.LOGIN_PASSWORD_WORKERS, settings.LOGIN_MAX_PENDING)
+        return _verifier
+
+
+def get_hasher_pool():
+    global _hasher_pool
+    with _hasher_pool_lock:
+        if _hasher_pool is None:
+            _hasher_pool = PasswordHasherPool(settings.REGISTER_HASH_WORKERS)
+        return _hasher_pool
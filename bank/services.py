@@ -1,23 +1,40 @@
+import calendar
 import random
-from decimal import Decimal
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 
-from django.contrib.auth import authenticate
-from django.db import transaction
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Case, Exists, F, Max, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
 from rest_framework.authtoken.admin import User
 from rest_framework.authtoken.models import Token
 
-from bank.models import BankAccount, Transaction
+from bank.models import (
+    BankAccount, ReconciliationCheckpoint, ScheduledTransfer, Transaction, TransactionRollup, VelocityBucket
+)
+from bank.money import CENT, MAX_AMOUNT_MINOR, apply_rate, from_minor_units, to_minor_units
+from bank.notifications import notify_transactions
+from bank.passwords import PasswordVerifierBusy, get_hasher_pool, get_verifier
 
 
 class UserServiceException(Exception):
     pass
 
 
+class UserServiceBusyException(UserServiceException):
+    pass
+
+
 class BankServiceException(Exception):
     pass
 
 
 class UserService:
+    WELCOME_BONUS = Decimal('10000.00')
+
     @staticmethod
     @transaction.atomic
     def register(email, password):
@@ -31,18 +48,88 @@ class UserService:
         BankAccount.objects.create(
             user=user,
             account_number=account_number,
-            balance=Decimal('10000.00')
+            balance=UserService.WELCOME_BONUS
         )
         return user
 
+    @staticmethod
+    def register_many(rows):
+        """
+        Register a batch of ``{'email': ..., 'password': ...}`` rows like register() does, in a few bulk queries.
+
+        Passwords are hashed before the transaction opens, so it only spans the bulk inserts; emails taken while
+        hashing are re-checked inside it. Returns ``(created_users, errors)``; each error names the row index
+        and why it was skipped, and the remaining rows are still registered.
+        """
+        errors = []
+        candidates = {}
+        for index, row in enumerate(rows):
+            email, password = row.get('email'), row.get('password')
+            if not email or not password:
+                errors.append({'row': index, 'email': email, 'detail': 'Email and password are required'})
+            elif email in candidates:
+                errors.append({'row': index, 'email': email, 'detail': 'Duplicate email in batch'})
+            else:
+                candidates[email] = (index, password)
+
+        UserService.skip_existing(candidates, errors)
+        passwords = get_hasher_pool().hash_many([password for _, password in candidates.values()])
+        encoded = dict(zip(candidates, passwords))
+
+        with transaction.atomic():
+            UserService.skip_existing(candidates, errors)
+            errors.sort(key=lambda error: error['row'])
+            if not candidates:
+                return [], errors
+            users = User.objects.bulk_create([
+                User(username=email, email=User.objects.normalize_email(email), password=encoded[email])
+                for email in candidates
+            ])
+            account_numbers = BankService.generate_account_numbers(len(users))
+            BankAccount.objects.bulk_create([
+                BankAccount(user=user, account_number=account_number, balance=UserService.WELCOME_BONUS)
+                for user, account_number in zip(users, account_numbers)
+            ])
+        return users, errors
+
+    @staticmethod
+    def skip_existing(candidates, errors):
+        """Remove already registered emails from ``candidates``, reporting each in ``errors``."""
+        if not candidates:
+            return
+        existing = set(User.objects.filter(email__in=candidates).values_list('email', flat=True))
+        existing |= set(User.objects.filter(username__in=candidates).values_list('username', flat=True))
+        for email in existing & candidates.keys():
+            index, _ = candidates.pop(email)
+            errors.append({'row': index, 'email': email, 'detail': 'Email already exists'})
+
     @staticmethod
     def login(email, password):
-        user = authenticate(username=email, password=password)
-        if not user:
+        """
+        Return the user's token, creating it on first login.
+
+        The user and their token are fetched in one query and the password is checked by the shared
+        PasswordVerifier; hashes with an outdated cost are replaced on success. Only active users may log in.
+        """
+        if not email or not password:
             raise UserServiceException('Invalid credentials')
+        user = User.objects.select_related('auth_token').filter(username=email).first()
 
-        token, _ = Token.objects.get_or_create(user=user)
-        return token
+        try:
+            is_correct, new_encoded = get_verifier().check(password, user.password if user else None)
+        except PasswordVerifierBusy:
+            raise UserServiceBusyException('Too many login attempts, try again later')
+        if not is_correct or not user.is_active:
+            raise UserServiceException('Invalid credentials')
+
+        if new_encoded:
+            user.password = new_encoded
+            user.save(update_fields=['password'])
+        try:
+            return user.auth_token
+        except Token.DoesNotExist:
+            token, _ = Token.objects.get_or_create(user=user)
+            return token
 
 
 class BankService:
@@ -56,6 +143,18 @@ class BankService:
             if not BankAccount.objects.filter(account_number=account_number).exists():
                 return account_number
 
+    @staticmethod
+    def generate_account_numbers(count):
+        account_numbers = set()
+        while len(account_numbers) < count:
+            candidates = {
+                ''.join([str(random.randint(0, 9)) for _ in range(10)])
+                for _ in range(count - len(account_numbers))
+            }
+            taken = BankAccount.objects.filter(account_number__in=candidates).values_list('account_number', flat=True)
+            account_numbers |= candidates - set(taken)
+        return list(account_numbers)
+
     @staticmethod
     def get_account(user):
         try:
@@ -79,7 +178,8 @@ class BankService:
     @classmethod
     @transaction.atomic
     def transfer(cls, sender, receiver_account_number, amount):
-        if amount <= 0:
+        amount_minor = to_minor_units(amount)
+        if amount_minor <= 0:
             raise BankServiceException('Amount must be positive')
 
         try:
@@ -88,29 +188,349 @@ class BankService:
         except BankAccount.DoesNotExist:
             raise BankServiceException('Sender or receiver account not found')
 
-        fee = cls.get_fee(amount)
-        total_deduction = amount + fee
+        fee_minor = cls.get_fee_minor(amount_minor)
+        total_deduction = amount_minor + fee_minor
 
-        if sender_account.balance < total_deduction:
+        if to_minor_units(sender_account.balance) < total_deduction:
             raise BankServiceException('Insufficient funds')
 
-        sender_account.balance -= total_deduction
-        receiver_account.balance += amount
-        sender_account.save()
-        receiver_account.save()
+        now = timezone.now()
+        cls.record_velocity(sender_account, amount_minor, now)
+
+        BankAccount.objects.filter(pk=sender_account.pk).update(balance=F('balance') - total_deduction)
+        BankAccount.objects.filter(pk=receiver_account.pk).update(balance=F('balance') + amount_minor)
 
         Transaction.objects.create(
             account=sender_account,
-            amount=total_deduction,
+            amount=from_minor_units(total_deduction),
+            fee=from_minor_units(fee_minor),
             transaction_type='debit'
         )
         Transaction.objects.create(
             account=receiver_account,
-            amount=amount,
+            amount=from_minor_units(amount_minor),
             transaction_type='credit'
         )
 
+        today = now.date()
+        cls.add_to_rollup(sender_account.pk, today, 'debit', total_deduction)
+        cls.add_to_rollup(sender_account.pk, today, 'fee', fee_minor)
+        cls.add_to_rollup(receiver_account.pk, today, 'credit', amount_minor)
+        notify_transactions(sender_account.pk, receiver_account.pk)
+
+    @classmethod
+    @transaction.atomic
+    def settle(cls, instructions):
+        """
+        Apply a batch of transfers by their net effect on each account.
+
+        ``instructions`` is an iterable of dicts with ``sender_account_number``, ``receiver_account_number`` and
+        ``amount``. Every transfer pays the usual fee, but funds are checked against each account's net position,
+        so cycles between the same accounts settle even when the individual transfers would not. Each account
+        gets a single balance UPDATE; debit and credit transactions are still recorded per transfer.
+        Returns the number of transfers settled.
+        """
+        transfers = []
+        for index, instruction in enumerate(instructions):
+            sender, receiver, amount_minor = cls.parse_instruction(index, instruction)
+            transfers.append((sender, receiver, amount_minor, cls.get_fee_minor(amount_minor)))
+        if not transfers:
+            return 0
+
+        account_numbers = {number for sender, receiver, _, _ in transfers for number in (sender, receiver)}
+        accounts = {
+            account.account_number: account
+            for account in BankAccount.objects.select_for_update().filter(account_number__in=account_numbers).order_by('pk')
+        }
+        if len(accounts) != len(account_numbers):
+            raise BankServiceException('Sender or receiver account not found')
+
+        net = defaultdict(int)
+        rollups = defaultdict(lambda: [0, 0])
+        for sender, receiver, amount_minor, fee_minor in transfers:
+            net[sender] -= amount_minor + fee_minor
+            net[receiver] += amount_minor
+            for key, value in (
+                ((sender, 'debit'), amount_minor + fee_minor),
+                ((sender, 'fee'), fee_minor),
+                ((receiver, 'credit'), amount_minor),
+            ):
+                rollups[key][0] += value
+                rollups[key][1] += 1
+
+        insufficient = sorted(
+            number for number, change in net.items() if to_minor_units(accounts[number].balance) + change < 0
+        )
+        if insufficient:
+            raise BankServiceException(f'Insufficient funds: {", ".join(insufficient)}')
+
+        for number, change in net.items():
+            if change:
+                BankAccount.objects.filter(pk=accounts[number].pk).update(balance=F('balance') + change)
+
+        Transaction.objects.bulk_create([
+            transaction_row
+            for sender, receiver, amount_minor, fee_minor in transfers
+            for transaction_row in (
+                Transaction(
+                    account=accounts[sender],
+                    amount=from_minor_units(amount_minor + fee_minor),
+                    fee=from_minor_units(fee_minor),
+                    transaction_type='debit',
+                ),
+                Transaction(account=accounts[receiver], amount=from_minor_units(amount_minor), transaction_type='credit'),
+            )
+        ])
+
+        today = timezone.now().date()
+        for (number, rollup_type), (total, count) in rollups.items():
+            cls.add_to_rollup(accounts[number].pk, today, rollup_type, total, count)
+        notify_transactions(*(account.pk for account in accounts.values()))
+        return len(transfers)
+
+    @staticmethod
+    def parse_instruction(index, instruction):
+        if not isinstance(instruction, dict):
+            raise BankServiceException(f'Instruction {index}: must be an object')
+        try:
+            sender = instruction['sender_account_number']
+            receiver = instruction['receiver_account_number']
+            amount = instruction['amount']
+        except KeyError as e:
+            raise BankServiceException(f'Instruction {index}: {e.args[0]} is required')
+        if not isinstance(sender, str) or not isinstance(receiver, str):
+            raise BankServiceException(f'Instruction {index}: account numbers must be strings')
+        try:
+            amount = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+        except InvalidOperation:
+            raise BankServiceException(f'Instruction {index}: invalid amount')
+        if not amount.is_finite():
+            raise BankServiceException(f'Instruction {index}: invalid amount')
+        if amount <= 0:
+            raise BankServiceException(f'Instruction {index}: Amount must be positive')
+        if amount > from_minor_units(MAX_AMOUNT_MINOR):
+            raise BankServiceException(f'Instruction {index}: Amount is too large')
+        if amount != amount.quantize(CENT):
+            raise BankServiceException(f'Instruction {index}: Amount has more than 2 decimal places')
+        return sender, receiver, to_minor_units(amount)
+
+    @staticmethod
+    def record_velocity(account, amount_minor, now):
+        """
+        Check the outgoing amount against the account tier's rolling-window limit and count it.
+
+        Each account keeps a ring of VELOCITY_WINDOW_SECONDS / VELOCITY_BUCKET_SECONDS counters, so the check reads
+        a bounded number of rows however busy the account is. The oldest bucket is counted in full, which makes the
+        window up to one bucket longer than configured. Callers must hold the account's row lock.
+        """
+        limit = settings.VELOCITY_LIMITS.get(account.tier)
+        if limit is None:
+            return
+        bucket = int(now.timestamp()) // settings.VELOCITY_BUCKET_SECONDS
+        slots = settings.VELOCITY_WINDOW_SECONDS // settings.VELOCITY_BUCKET_SECONDS
+
+        used = VelocityBucket.objects.filter(account=account, bucket__gt=bucket - slots).aggregate(
+            total=Sum('total', default=0)
+        )['total']
+        if to_minor_units(used) + amount_minor > to_minor_units(limit):
+            raise BankServiceException('Transfer limit exceeded')
+
+        lookup = {'account': account, 'slot': bucket % slots}
+        updated = VelocityBucket.objects.filter(**lookup).update(
+            total=Case(When(bucket=bucket, then=F('total') + amount_minor), default=Value(amount_minor)),
+            bucket=bucket,
+        )
+        if not updated:
+            VelocityBucket.objects.create(**lookup, bucket=bucket, total=from_minor_units(amount_minor))
+
+    @staticmethod
+    def add_to_rollup(account_id, date, rollup_type, amount_minor, count=1):
+        lookup = {'account_id': account_id, 'date': date, 'rollup_type': rollup_type}
+        increment = {'total': F('total') + amount_minor, 'count': F('count') + count}
+        if TransactionRollup.objects.filter(**lookup).update(**increment):
+            return
+        try:
+            with transaction.atomic():
+                TransactionRollup.objects.create(**lookup, total=from_minor_units(amount_minor), count=count)
+        except IntegrityError:
+            TransactionRollup.objects.filter(**lookup).update(**increment)
+
+    @staticmethod
+    def get_summary(user, granularity='day', date_from=None, date_to=None):
+        filters = {'account__user': user}
+        if date_from:
+            filters['date__gte'] = date_from
+        if date_to:
+            filters['date__lte'] = date_to
+        rollups = TransactionRollup.objects.filter(**filters)
+        if granularity == 'month':
+            rollups = rollups.annotate(period=TruncMonth('date'))
+        else:
+            rollups = rollups.annotate(period=F('date'))
+        rows = rollups.values('period', 'rollup_type').annotate(total=Sum('total')).order_by('period')
+
+        summary = {}
+        for row in rows:
+            period = summary.setdefault(row['period'], {
+                'period': row['period'],
+                **{rollup_type: Decimal('0.00') for rollup_type, _ in TransactionRollup.ROLLUP_TYPES},
+            })
+            period[row['rollup_type']] = row['total']
+        return list(summary.values())
+
     @staticmethod
     def get_fee(amount):
-        return max(BankService.MIN_FEE, amount * BankService.FEE_RATE)
+        return from_minor_units(BankService.get_fee_minor(to_minor_units(amount)))
+
+    @staticmethod
+    def get_fee_minor(amount_minor):
+        """Fee in cents: FEE_RATE of the amount rounded half up to the cent, never below MIN_FEE."""
+        return max(to_minor_units(BankService.MIN_FEE), apply_rate(amount_minor, BankService.FEE_RATE))
+
+    @staticmethod
+    def reconcile_accounts(start_id, end_id, full=False):
+        """
+        Check that every account with pk in [start_id, end_id) holds its welcome bonus plus credits minus debits.
+
+        Without ``full``, only accounts that have no checkpoint, have transactions newer than it, or whose balance
+        differs from the checkpointed one are checked, and only their newer transactions are summed. Transfers
+        lock both accounts before inserting, so transaction ids grow monotonically per account and the last seen
+        id is a safe watermark. Returns the number of accounts checked and the discrepancies; checkpoints are only
+        advanced for accounts that balance.
+        """
+        accounts = BankAccount.objects.filter(pk__gte=start_id, pk__lt=end_id).annotate(
+            checkpoint_id=Coalesce(F('reconciliation_checkpoint__last_transaction_id'), 0)
+        )
+        credit = Q(transactions__transaction_type='credit')
+        debit = Q(transactions__transaction_type='debit')
+        if not full:
+            accounts = accounts.filter(
+                Q(reconciliation_checkpoint__isnull=True)
+                | Exists(Transaction.objects.filter(account=OuterRef('pk'), id__gt=OuterRef('checkpoint_id')))
+                | ~Q(balance=F('reconciliation_checkpoint__balance'))
+            )
+            credit &= Q(transactions__id__gt=F('checkpoint_id'))
+            debit &= Q(transactions__id__gt=F('checkpoint_id'))
+        rows = accounts.values(
+            'pk', 'account_number', 'balance', 'checkpoint_id',
+            'reconciliation_checkpoint__credit_total', 'reconciliation_checkpoint__debit_total',
+        ).annotate(
+            credit=Sum('transactions__amount', filter=credit, default=0),
+            debit=Sum('transactions__amount', filter=debit, default=0),
+            last_transaction_id=Max('transactions__id', default=0),
+        ).order_by('pk')
+
+        checked = 0
+        discrepancies = []
+        checkpoints = []
+        for row in rows.iterator():
+            checked += 1
+            credit_total = row['credit']
+            debit_total = row['debit']
+            if not full:
+                credit_total += row['reconciliation_checkpoint__credit_total'] or 0
+                debit_total += row['reconciliation_checkpoint__debit_total'] or 0
+            expected = UserService.WELCOME_BONUS + credit_total - debit_total
+            if row['balance'] != expected:
+                discrepancies.append({
+                    'account_id': row['pk'],
+                    'account_number': row['account_number'],
+                    'balance': str(row['balance']),
+                    'expected': str(expected),
+                    'difference': str(row['balance'] - expected),
+                })
+                continue
+            checkpoints.append(ReconciliationCheckpoint(
+                account_id=row['pk'],
+                last_transaction_id=row['last_transaction_id'],
+                balance=row['balance'],
+                credit_total=credit_total,
+                debit_total=debit_total,
+            ))
+
+        ReconciliationCheckpoint.objects.bulk_create(
+            checkpoints,
+            update_conflicts=True,
+            unique_fields=['account'],
+            update_fields=['last_transaction_id', 'balance', 'credit_total', 'debit_total', 'reconciled_at'],
+        )
+        return checked, discrepancies
+
+    @classmethod
+    def schedule_transfer(cls, sender, receiver_account_number, amount, interval, starts_at):
+        if to_minor_units(amount) <= 0:
+            raise BankServiceException('Amount must be positive')
+        if starts_at < timezone.now() - timedelta(seconds=settings.SCHEDULED_TRANSFER_START_GRACE_SECONDS):
+            raise BankServiceException('Start time is in the past')
+        if not BankAccount.objects.filter(account_number=receiver_account_number).exists():
+            raise BankServiceException('Sender or receiver account not found')
+        return ScheduledTransfer.objects.create(
+            sender=cls.get_account(sender),
+            receiver_account_number=receiver_account_number,
+            amount=amount,
+            interval=interval,
+            starts_at=starts_at,
+            next_run_at=starts_at,
+        )
+
+    @staticmethod
+    def cancel_scheduled_transfer(user, scheduled_transfer_id):
+        """Deactivate one of the user's standing orders. The order is kept for its history."""
+        cancelled = ScheduledTransfer.objects.filter(pk=scheduled_transfer_id, sender__user=user).update(is_active=False)
+        if not cancelled:
+            raise BankServiceException('Scheduled transfer not found')
+        return ScheduledTransfer.objects.get(pk=scheduled_transfer_id)
+
+    @staticmethod
+    def get_scheduled_run(starts_at, interval, count):
+        """Time of the run that follows ``count`` completed runs. Monthly runs keep the start day, clamped to month end."""
+        if interval == 'daily':
+            return starts_at + timedelta(days=count)
+        if interval == 'weekly':
+            return starts_at + timedelta(weeks=count)
+        months = starts_at.month - 1 + count
+        year, month = starts_at.year + months // 12, months % 12 + 1
+        return starts_at.replace(year=year, month=month, day=min(starts_at.day, calendar.monthrange(year, month)[1]))
+
+    @classmethod
+    def run_scheduled_transfers(cls, limit):
+        """
+        Claim up to ``limit`` due scheduled transfers, advance them and execute one run of each.
+
+        Claiming is a short transaction: rows locked by another worker are skipped, and each claimed schedule's
+        ``run_count`` and ``next_run_at`` are advanced before any money moves, so a run is never executed twice.
+        Each transfer then runs in its own transaction and its outcome is written back to the schedule.
+        A schedule that missed runs during downtime is only advanced by one interval per claim, so it is claimed
+        again until it has caught up; catch-up is spread over claims rather than done in one burst, and no run is
+        dropped. Failed runs are recorded in ``last_error``. Returns the number of runs claimed.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            due = list(
+                ScheduledTransfer.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .select_related('sender__user')
+                .filter(is_active=True, next_run_at__lte=now)
+                .order_by('next_run_at')[:limit]
+            )
+            for scheduled in due:
+                scheduled.run_count += 1
+                if scheduled.interval == 'once':
+                    scheduled.is_active = False
+                else:
+                    scheduled.next_run_at = cls.get_scheduled_run(
+                        scheduled.starts_at, scheduled.interval, scheduled.run_count
+                    )
+
+            ScheduledTransfer.objects.bulk_update(due, ['run_count', 'is_active', 'next_run_at'])
 
+        for scheduled in due:
+            try:
+                cls.transfer(scheduled.sender.user, scheduled.receiver_account_number, scheduled.amount)
+                last_error = ''
+            except BankServiceException as e:
+                last_error = str(e)
+            except DatabaseError as e:
+                last_error = f'Database error: {e}'[:255]
+            ScheduledTransfer.objects.filter(pk=scheduled.pk).update(last_run_at=now, last_error=last_error)
+        return len(due)
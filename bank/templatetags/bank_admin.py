@@ -0,0 +1,73 @@
+import datetime
+
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.db.models import Max, Min
+from django.template import Library
+from django.utils import formats, timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = Library()
+
+
+def range_date_hierarchy(cl):
+    """
+    Admin's date hierarchy, with the top level built from the field's Min and Max.
+
+    Without a date filter the stock tag lists years, months or days with SELECT DISTINCT over every row.
+    Here the choices span the first to the last date instead, so empty periods may be listed.
+    Once a date is picked, the stock tag's queries are bounded by the date filter and are used as-is.
+    """
+    field_name = cl.date_hierarchy
+    if any(f'{field_name}__{part}' in cl.params for part in ('year', 'month', 'day')):
+        return date_hierarchy(cl)
+
+    date_range = cl.queryset.aggregate(first=Min(field_name), last=Max(field_name))
+    if not date_range['first']:
+        return {'show': True, 'back': None, 'choices': []}
+    first, last = (timezone.localtime(value) if timezone.is_aware(value) else value for value in date_range.values())
+    year_field, month_field, day_field = (f'{field_name}__{part}' for part in ('year', 'month', 'day'))
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{field_name}__'])
+
+    if first.year != last.year:
+        return {
+            'show': True,
+            'back': None,
+            'choices': [
+                {'link': link({year_field: str(year)}), 'title': str(year)}
+                for year in range(first.year, last.year + 1)
+            ],
+        }
+    if first.month != last.month:
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [
+                {
+                    'link': link({year_field: first.year, month_field: month}),
+                    'title': capfirst(formats.date_format(datetime.date(first.year, month, 1), 'YEAR_MONTH_FORMAT')),
+                }
+                for month in range(first.month, last.month + 1)
+            ],
+        }
+    return {
+        'show': True,
+        'back': {'link': link({year_field: first.year}), 'title': str(first.year)},
+        'choices': [
+            {
+                'link': link({year_field: first.year, month_field: first.month, day_field: day}),
+                'title': capfirst(formats.date_format(datetime.date(first.year, first.month, day), 'MONTH_DAY_FORMAT')),
+            }
+            for day in range(first.day, last.day + 1)
+        ],
+    }
+
+
+@register.tag(name='range_date_hierarchy')
+def range_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser, token, func=range_date_hierarchy, template_name='date_hierarchy.html', takes_context=False
+    )
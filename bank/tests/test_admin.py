@@ -0,0 +1,60 @@
+from datetime import datetime, timezone as datetime_timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bank.models import BankAccount, Transaction
+from bank.services import BankService, UserService
+
+
+class AdminChangeListTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="testpassword123")
+        self.client.force_login(admin)
+        self.users = [UserService.register(f"user{i}@example.com", "testpassword123") for i in range(3)]
+        for sender, receiver in zip(self.users, self.users[1:]):
+            BankService.transfer(sender, receiver.bank_account.account_number, Decimal("10.00"))
+
+    def get_query_count(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_account_list_queries_should_not_grow_with_rows(self):
+        url = "/admin/bank/bankaccount/"
+        queries = self.get_query_count(url)
+        UserService.register("another@example.com", "testpassword123")
+        self.assertEqual(self.get_query_count(url), queries)
+
+    def test_transaction_list_queries_should_not_grow_with_rows(self):
+        url = "/admin/bank/transaction/"
+        queries = self.get_query_count(url)
+        BankService.transfer(self.users[2], self.users[0].bank_account.account_number, Decimal("10.00"))
+        self.assertEqual(self.get_query_count(url), queries)
+
+    def test_search_by_account_number_should_match_exactly(self):
+        account = BankAccount.objects.get(user=self.users[0])
+        response = self.client.get("/admin/bank/bankaccount/", {"q": account.account_number})
+        self.assertEqual(list(response.context["cl"].result_list), [account])
+        response = self.client.get("/admin/bank/bankaccount/", {"q": account.account_number[:5]})
+        self.assertEqual(list(response.context["cl"].result_list), [])
+
+    def test_transaction_list_should_filter_by_date_hierarchy(self):
+        response = self.client.get("/admin/bank/transaction/", {"created_at__year": "2000"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cl"].result_list), [])
+
+    def test_unfiltered_transaction_list_should_not_select_distinct_dates(self):
+        Transaction.objects.filter(pk=Transaction.objects.earliest('pk').pk).update(
+            created_at=datetime(2023, 6, 1, 12, 0, tzinfo=datetime_timezone.utc)
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/admin/bank/transaction/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in context.captured_queries if "DISTINCT" in query["sql"]])
+        self.assertContains(response, "?created_at__year=2023")
+        self.assertContains(response, "?created_at__year=2024")
@@ -1,12 +1,21 @@
+import json
 from decimal import Decimal
+from unittest.mock import patch
 from datetime import timezone as datetime_timezone
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from django.utils import timezone
 
+from bank.api.admission import AccountConcurrencyLimit
+from bank.api.streams import fetch_transactions
 from bank.models import BankAccount, Transaction
-from bank.services import UserService
+from bank.passwords import PasswordVerifier
+from bank.services import BankService, UserService
 
 
 class RegisterViewTests(APITestCase):
@@ -43,6 +52,35 @@ class RegisterViewTests(APITestCase):
         self.assertFalse(Token.objects.filter(user=user).exists())
 
 
+class RegisterBatchViewTests(APITestCase):
+    def setUp(self):
+        self.url = "/api/register/batch/"
+        self.admin = User.objects.create_user(username="admin", password="testpassword123", is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.admin).key}')
+
+    def test_when_not_staff_should_return_403(self):
+        user = UserService.register("test@example.com", "testpassword123")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+        response = self.client.post(self.url, {"users": []}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_when_empty_batch_should_return_400(self):
+        response = self.client.post(self.url, {"users": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_when_valid_batch_should_report_created_and_errors(self):
+        response = self.client.post(self.url, {"users": [
+            {"email": "a@example.com", "password": "testpassword123"},
+            {"email": "b@example.com"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {
+            "created": 1,
+            "errors": [{"row": 1, "email": "b@example.com", "detail": "Email and password are required"}],
+        })
+        self.assertTrue(BankAccount.objects.filter(user__email="a@example.com").exists())
+
+
 class LoginViewTests(APITestCase):
     def setUp(self):
         self.email = "test@example.com"
@@ -55,6 +93,12 @@ class LoginViewTests(APITestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.data, {"detail": "Invalid credentials"})
 
+    def test_when_verifier_saturated_should_return_503(self):
+        with patch('bank.services.get_verifier', return_value=PasswordVerifier(workers=0, max_pending=0)):
+            response = self.client.post(self.login_url, {"email": self.email, "password": self.password})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
     def test_when_valid_credentials_should_return_token(self):
         response = self.client.post(self.login_url, {"email": self.email, "password": self.password})
         self.assertEqual(response.status_code, 200)
@@ -159,6 +203,98 @@ class TransactionListViewTests(APITestCase):
         self.assertIn("date_from", response.data)
 
 
+class TransactionSummaryViewTests(APITestCase):
+    def setUp(self):
+        self.summary_url = "/api/transactions/summary/"
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        receiver = UserService.register("receiver@example.com", "testpassword123")
+        BankService.transfer(self.user, receiver.bank_account.account_number, Decimal("300.00"))
+
+    def test_when_unauthenticated_should_return_401(self):
+        self.client.credentials()  # Remove auth
+        response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_when_invalid_granularity_should_return_400(self):
+        response = self.client.get(self.summary_url, {"granularity": "year"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("granularity", response.data)
+
+    def test_when_month_granularity_should_return_monthly_summary(self):
+        response = self.client.get(self.summary_url, {"granularity": "month"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"summary": [{
+            "period": timezone.now().date().replace(day=1).isoformat(),
+            "credit": "0.00",
+            "debit": "307.50",
+            "fee": "7.50",
+        }]})
+
+
+@override_settings(TRANSACTION_STREAM_POLL_INTERVAL=0.01)
+class TransactionStreamViewTests(TestCase):
+    def setUp(self):
+        self.stream_url = "/api/transactions/stream/"
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.receiver = UserService.register("receiver@example.com", "testpassword123")
+        self.token = Token.objects.create(user=self.receiver)
+        self.headers = {"Authorization": f"Token {self.token.key}"}
+        BankService.transfer(self.user, self.receiver.bank_account.account_number, Decimal("100.00"))
+        self.first = self.receiver.bank_account.transactions.get()
+
+    async def read_events(self, response, count):
+        events = []
+        async for chunk in response.streaming_content:
+            chunk = chunk.decode()
+            if chunk.startswith("id:"):
+                events.append(chunk)
+            if len(events) == count:
+                break
+        await response.streaming_content.aclose()
+        return events
+
+    async def test_when_unauthenticated_should_return_401(self):
+        response = await self.async_client.get(self.stream_url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.content)["detail"], "Authentication credentials were not provided.")
+
+    async def test_when_invalid_last_event_id_should_return_400(self):
+        response = await self.async_client.get(self.stream_url, headers={**self.headers, "Last-Event-ID": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_when_last_event_id_given_should_resume_after_it(self):
+        response = await self.async_client.get(self.stream_url, headers={**self.headers, "Last-Event-ID": "0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = await self.read_events(response, 1)
+        self.assertEqual(events[0].split("\n")[:2], [f"id: {self.first.pk}", "event: transaction"])
+        data = json.loads(events[0].split("\n")[2].removeprefix("data: "))
+        self.assertEqual((data["amount"], data["transaction_type"]), ("100.00", "credit"))
+
+    async def test_when_no_cursor_should_stream_only_new_transactions(self):
+        response = await self.async_client.get(self.stream_url, headers=self.headers)
+        await sync_to_async(BankService.transfer)(
+            self.user, self.receiver.bank_account.account_number, Decimal("50.00")
+        )
+        events = await self.read_events(response, 1)
+        self.assertNotIn(f"id: {self.first.pk}\n", events[0])
+        self.assertIn('"amount": "50.00"', events[0])
+
+
+class FetchTransactionsTests(TestCase):
+    def test_should_release_connection_outside_transaction(self):
+        with patch.object(connection, "in_atomic_block", False), patch.object(connection, "close") as close:
+            fetch_transactions(0, 0)
+        close.assert_called_once_with()
+
+    def test_when_in_transaction_should_keep_connection(self):
+        with patch.object(connection, "close") as close:
+            fetch_transactions(0, 0)
+        close.assert_not_called()
+
+
 class TransferViewTests(APITestCase):
     def setUp(self):
         self.sender_email = "sender@example.com"
@@ -233,3 +369,133 @@ class TransferViewTests(APITestCase):
         self.assertEqual(sender_transactions[0].transaction_type, "debit")
         self.assertEqual(receiver_transactions[0].amount, transfer_amount)
         self.assertEqual(receiver_transactions[0].transaction_type, "credit")
+
+
+class ScheduledTransferViewTests(APITestCase):
+    def setUp(self):
+        self.url = "/api/scheduled-transfers/"
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.receiver = UserService.register("receiver@example.com", "testpassword123")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_when_unauthenticated_should_return_401(self):
+        self.client.credentials()  # Remove auth
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_when_nonexistent_account_should_return_400(self):
+        response = self.client.post(self.url, {
+            "receiver_account_number": "0000000000",
+            "amount": "100.00",
+            "interval": "monthly",
+            "starts_at": "2099-10-01T09:00:00Z",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["detail"], "Sender or receiver account not found")
+
+    def test_when_starts_in_past_should_return_400(self):
+        response = self.client.post(self.url, {
+            "receiver_account_number": self.receiver.bank_account.account_number,
+            "amount": "100.00",
+            "interval": "monthly",
+            "starts_at": "2025-10-01T09:00:00Z",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["starts_at"], ["Start time is in the past"])
+
+    def test_when_valid_should_create_and_list_schedule(self):
+        response = self.client.post(self.url, {
+            "receiver_account_number": self.receiver.bank_account.account_number,
+            "amount": "100.00",
+            "interval": "monthly",
+            "starts_at": "2099-10-01T09:00:00Z",
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["next_run_at"], "2099-10-01T09:00:00Z")
+        self.assertTrue(response.data["is_active"])
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["scheduled_transfers"]), 1)
+        self.assertEqual(response.data["scheduled_transfers"][0]["amount"], "100.00")
+
+    def test_when_cancelled_should_deactivate_schedule(self):
+        scheduled = BankService.schedule_transfer(
+            self.user, self.receiver.bank_account.account_number, Decimal("100.00"), "daily", timezone.now()
+        )
+        response = self.client.delete(f"{self.url}{scheduled.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["is_active"])
+        self.assertEqual(BankService.run_scheduled_transfers(10), 0)
+
+    def test_when_cancelling_other_users_schedule_should_return_404(self):
+        scheduled = BankService.schedule_transfer(
+            self.receiver, self.user.bank_account.account_number, Decimal("100.00"), "daily", timezone.now()
+        )
+        response = self.client.delete(f"{self.url}{scheduled.pk}/")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["detail"], "Scheduled transfer not found")
+        scheduled.refresh_from_db()
+        self.assertTrue(scheduled.is_active)
+
+
+@override_settings(ADMISSION_RATE=1, ADMISSION_BURST=2, ADMISSION_MAX_IN_FLIGHT=1)
+class AdmissionControlTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.transfer_url = "/api/transfer/"
+        self.sender = UserService.register("sender@example.com", "testpassword123")
+        self.receiver = UserService.register("receiver@example.com", "testpassword123")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.sender).key}')
+        self.payload = {"receiver_account_number": self.receiver.bank_account.account_number, "amount": "10.00"}
+
+    def test_when_burst_exhausted_should_return_429_with_retry_after(self):
+        self.assertEqual(self.client.post(self.transfer_url, self.payload).status_code, 200)
+        self.assertEqual(self.client.post(self.transfer_url, self.payload).status_code, 200)
+        response = self.client.post(self.transfer_url, self.payload)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(response["Retry-After"], {"1", "2"})
+        self.assertEqual(self.sender.bank_account.transactions.count(), 2)
+
+    def test_when_reads_should_not_spend_tokens(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get("/api/scheduled-transfers/").status_code, 200)
+        self.assertEqual(self.client.post(self.transfer_url, self.payload).status_code, 200)
+
+    def test_when_account_has_transfer_in_flight_should_return_429(self):
+        with AccountConcurrencyLimit(self.sender):
+            response = self.client.post(self.transfer_url, self.payload)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertTrue(response.data["detail"].startswith("Too many transfers in progress."))
+        self.assertEqual(self.client.post(self.transfer_url, self.payload).status_code, 200)
+
+    def test_acquire_should_renew_in_flight_expiry(self):
+        with patch.object(cache, "touch", wraps=cache.touch) as touch:
+            with AccountConcurrencyLimit(self.sender) as limit:
+                touch.assert_called_once_with(limit.key, 60)
+
+    def test_when_in_flight_counter_recreated_should_not_go_negative(self):
+        limit = AccountConcurrencyLimit(self.sender)
+        with limit:
+            cache.set(limit.key, 0)
+        self.assertEqual(cache.get(limit.key), 0)
+
+    def test_stats_should_report_counters_to_staff(self):
+        with AccountConcurrencyLimit(self.sender):
+            self.client.post(self.transfer_url, self.payload)
+        self.client.post(self.transfer_url, self.payload)
+        self.client.post(self.transfer_url, self.payload)
+
+        response = self.client.get("/api/admission/stats/")
+        self.assertEqual(response.status_code, 403)
+
+        admin = User.objects.create_user(username="admin", password="testpassword123", is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=admin).key}')
+        response = self.client.get("/api/admission/stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            "counters": {"admitted": 2, "rate_limited": 1, "in_flight_admitted": 2, "in_flight_rejected": 1},
+            "limits": {"rate": 1, "burst": 2, "max_in_flight": 1},
+        })
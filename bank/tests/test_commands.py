@@ -0,0 +1,218 @@
+import json
+from datetime import timedelta
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+from django.test import TestCase
+from django.utils import timezone
+
+from bank.management.commands.rebuild_rollups import Command as RebuildRollupsCommand
+from bank.models import BankAccount, ReconciliationCheckpoint, ScheduledTransfer, TransactionRollup
+from bank.services import BankService, UserService
+
+
+class RebuildRollupsCommandTests(TestCase):
+    def setUp(self):
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.receiver = UserService.register("receiver@example.com", "testpassword123")
+        self.account = BankAccount.objects.get(user=self.user)
+        BankService.transfer(self.user, self.receiver.bank_account.account_number, Decimal("300.00"))
+        BankService.transfer(self.user, self.receiver.bank_account.account_number, Decimal("100.00"))
+
+    def test_rebuild_should_match_incremental_rollups(self):
+        expected = set(TransactionRollup.objects.values_list('account_id', 'date', 'rollup_type', 'total', 'count'))
+        TransactionRollup.objects.update(total=0, count=0)
+
+        out = StringIO()
+        call_command('rebuild_rollups', stdout=out)
+
+        self.assertEqual(
+            set(TransactionRollup.objects.values_list('account_id', 'date', 'rollup_type', 'total', 'count')),
+            expected,
+        )
+        self.assertEqual(out.getvalue().strip(), "Rebuilt 3 rollups")
+
+    def test_rebuild_in_ranges_should_cover_every_account(self):
+        expected = set(TransactionRollup.objects.values_list('account_id', 'date', 'rollup_type', 'total', 'count'))
+        TransactionRollup.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_rollups', '--range-size', '1', stdout=out)
+
+        self.assertEqual(
+            set(TransactionRollup.objects.values_list('account_id', 'date', 'rollup_type', 'total', 'count')),
+            expected,
+        )
+
+
+    def test_when_range_deadlocks_should_retry_it(self):
+        expected = set(TransactionRollup.objects.values_list('account_id', 'date', 'rollup_type', 'total', 'count'))
+        TransactionRollup.objects.all().delete()
+        errors = iter([OperationalError('deadlock detected')])
+        rebuild_range = RebuildRollupsCommand.rebuild_range
+
+        def flaky_rebuild_range(command, start_id, end_id):
+            if error := next(errors, None):
+                raise error
+            return rebuild_range(command, start_id, end_id)
+
+        out, err = StringIO(), StringIO()
+        with patch.object(RebuildRollupsCommand, 'rebuild_range', autospec=True, side_effect=flaky_rebuild_range):
+            call_command('rebuild_rollups', stdout=out, stderr=err)
+
+        self.assertIn("deadlock detected", err.getvalue())
+        self.assertEqual(
+            set(TransactionRollup.objects.values_list('account_id', 'date', 'rollup_type', 'total', 'count')),
+            expected,
+        )
+
+
+class ReconcileCommandTests(TestCase):
+    def setUp(self):
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.receiver = UserService.register("receiver@example.com", "testpassword123")
+        self.account = BankAccount.objects.get(user=self.user)
+        BankService.transfer(self.user, self.receiver.bank_account.account_number, Decimal("300.00"))
+
+    def reconcile(self, *args):
+        out = StringIO()
+        call_command('reconcile', '--workers', '0', *args, stdout=out)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_when_balances_match_should_checkpoint_accounts(self):
+        self.assertEqual(self.reconcile(), [{'accounts_checked': 2, 'discrepancies': 0}])
+        checkpoint = ReconciliationCheckpoint.objects.get(account=self.account)
+        self.assertEqual(checkpoint.debit_total, Decimal("307.50"))
+        self.assertEqual(checkpoint.last_transaction_id, self.account.transactions.get().pk)
+
+    def test_when_accounts_unchanged_should_skip_them(self):
+        self.reconcile()
+        BankService.transfer(self.receiver, self.account.account_number, Decimal("50.00"))
+
+        self.assertEqual(self.reconcile(), [{'accounts_checked': 2, 'discrepancies': 0}])
+        self.assertEqual(self.reconcile(), [{'accounts_checked': 0, 'discrepancies': 0}])
+        self.assertEqual(self.reconcile('--full'), [{'accounts_checked': 2, 'discrepancies': 0}])
+        checkpoint = ReconciliationCheckpoint.objects.get(account=self.account)
+        self.assertEqual((checkpoint.credit_total, checkpoint.debit_total), (Decimal("50.00"), Decimal("307.50")))
+
+    def test_when_checkpointed_balance_tampered_without_transaction_should_report_discrepancy(self):
+        self.reconcile()
+        BankAccount.objects.filter(pk=self.account.pk).update(balance=Decimal("99999.00"))
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('reconcile', '--workers', '0', stdout=out)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(lines[0]['account_id'], self.account.pk)
+        self.assertEqual(lines[0]['expected'], '9692.50')
+        self.assertEqual(lines[-1], {'accounts_checked': 1, 'discrepancies': 1})
+
+    def test_when_account_never_transacted_should_check_it(self):
+        idle = UserService.register("idle@example.com", "testpassword123").bank_account
+        self.assertEqual(self.reconcile(), [{'accounts_checked': 3, 'discrepancies': 0}])
+        self.assertTrue(ReconciliationCheckpoint.objects.filter(account=idle).exists())
+
+        BankAccount.objects.filter(pk=idle.pk).update(balance=Decimal("99999.00"))
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('reconcile', '--workers', '0', stdout=out)
+        self.assertEqual(json.loads(out.getvalue().splitlines()[0])['account_id'], idle.pk)
+
+    def test_when_balance_mismatch_should_report_discrepancy(self):
+        BankAccount.objects.filter(pk=self.account.pk).update(balance=Decimal("9700.00"))
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('reconcile', '--workers', '0', stdout=out)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(lines, [
+            {
+                'account_id': self.account.pk,
+                'account_number': self.account.account_number,
+                'balance': '9700.00',
+                'expected': '9692.50',
+                'difference': '7.50',
+            },
+            {'accounts_checked': 2, 'discrepancies': 1},
+        ])
+        self.assertFalse(ReconciliationCheckpoint.objects.filter(account=self.account).exists())
+
+
+class SettleCommandTests(TestCase):
+    def setUp(self):
+        self.sender = UserService.register("sender@example.com", "testpassword123").bank_account
+        self.receiver = UserService.register("receiver@example.com", "testpassword123").bank_account
+
+    def settle(self, instructions):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(instructions, f)
+            f.flush()
+            out = StringIO()
+            call_command('settle', f.name, stdout=out)
+        return out.getvalue().strip()
+
+    def test_settle_should_apply_batch(self):
+        output = self.settle([{
+            'sender_account_number': self.sender.account_number,
+            'receiver_account_number': self.receiver.account_number,
+            'amount': 100.10,
+        }])
+        self.assertEqual(output, "Settled 1 transfers")
+        self.receiver.refresh_from_db()
+        self.assertEqual(self.receiver.balance, Decimal("10100.10"))
+
+    def test_when_instruction_incomplete_should_raise_command_error(self):
+        with self.assertRaises(CommandError):
+            self.settle([{'sender_account_number': self.sender.account_number, 'amount': "1.00"}])
+
+    def test_when_amount_invalid_should_raise_command_error(self):
+        for amount in ["abc", "NaN", "1e30", "1.005"]:
+            with self.subTest(amount=amount), self.assertRaises(CommandError):
+                self.settle([{
+                    'sender_account_number': self.sender.account_number,
+                    'receiver_account_number': self.receiver.account_number,
+                    'amount': amount,
+                }])
+
+    def test_when_batch_not_a_list_should_raise_command_error(self):
+        with self.assertRaises(CommandError):
+            self.settle({'amount': "1.00"})
+
+
+class RunScheduledTransfersCommandTests(TestCase):
+    def test_should_process_due_schedules(self):
+        user = UserService.register("test@example.com", "testpassword123")
+        receiver = UserService.register("receiver@example.com", "testpassword123")
+        scheduled = BankService.schedule_transfer(
+            user, receiver.bank_account.account_number, Decimal("100.00"), "daily", timezone.now()
+        )
+        starts_at = timezone.now() - timedelta(days=1)
+        ScheduledTransfer.objects.filter(pk=scheduled.pk).update(starts_at=starts_at, next_run_at=starts_at)
+
+        out = StringIO()
+        call_command('run_scheduled_transfers', '--workers', '0', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), "Processed 2 scheduled transfer runs")
+
+
+class RegisterUsersCommandTests(TestCase):
+    def test_should_register_rows_in_batches(self):
+        UserService.register("taken@example.com", "testpassword123")
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as f:
+            f.write("email,password\na@example.com,pw1\ntaken@example.com,pw2\nb@example.com,pw3\na@example.com,pw4\n")
+            f.flush()
+            out = StringIO()
+            call_command('register_users', f.name, '--batch-size', '2', stdout=out)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(lines, [
+            {'row': 1, 'email': 'taken@example.com', 'detail': 'Email already exists'},
+            {'row': 3, 'email': 'a@example.com', 'detail': 'Email already exists'},
+            {'created': 2, 'errors': 2},
+        ])
+        self.assertEqual(BankAccount.objects.count(), 3)
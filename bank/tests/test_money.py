@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+
+from bank.models import BankAccount, Transaction
+from bank.money import apply_rate, from_minor_units, to_minor_units
+from bank.services import UserService
+
+
+class MoneyConversionTests(TestCase):
+    def test_to_minor_units_should_return_cents(self):
+        self.assertEqual(to_minor_units(Decimal('10000.55')), 1000055)
+        self.assertEqual(to_minor_units(Decimal('0.005')), 1)
+
+    def test_from_minor_units_should_return_two_place_decimal(self):
+        self.assertEqual(from_minor_units(1000055), Decimal('10000.55'))
+        self.assertEqual(str(from_minor_units(500)), '5.00')
+
+    def test_apply_rate_should_round_half_up(self):
+        self.assertEqual(apply_rate(30010, Decimal('0.025')), 750)
+        self.assertEqual(apply_rate(30020, Decimal('0.025')), 751)
+
+
+class MoneyFieldTests(TestCase):
+    def setUp(self):
+        user = UserService.register("test@example.com", "testpassword123")
+        self.account = BankAccount.objects.get(user=user)
+
+    def test_balance_should_be_stored_as_integer_cents(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT balance FROM bank_bankaccount WHERE id = %s', [self.account.pk])
+            self.assertEqual(cursor.fetchone()[0], 1000000)
+
+    def test_sum_should_return_decimal(self):
+        Transaction.objects.create(account=self.account, amount=Decimal('0.10'), transaction_type='credit')
+        Transaction.objects.create(account=self.account, amount=Decimal('0.20'), transaction_type='credit')
+        total = Transaction.objects.aggregate(total=Sum('amount'))['total']
+        self.assertEqual(total, Decimal('0.30'))
@@ -1,13 +1,25 @@
-from datetime import timezone as datetime_timezone
+import os
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta, timezone as datetime_timezone
 from decimal import Decimal
+from unittest.mock import patch
 
+from django.db import OperationalError
 from django.utils import timezone
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 
-from bank.models import BankAccount, Transaction
-from bank.services import UserService, UserServiceException, BankService, BankServiceException
+from bank.models import BankAccount, ScheduledTransfer, Transaction, TransactionRollup, VelocityBucket
+from bank.passwords import PasswordHasherPool, PasswordVerifier, PasswordVerifierBusy
+from bank.services import (
+    UserService, UserServiceException, UserServiceBusyException, BankService, BankServiceException
+)
+
+
+def kill_worker(*args):
+    os._exit(1)
 
 
 class UserServiceTests(TestCase):
@@ -39,6 +51,45 @@ class UserServiceTests(TestCase):
         self.assertEqual(account.balance, Decimal("10000.00"))
         self.assertFalse(Token.objects.filter(user=user).exists())
 
+    def test_register_many_should_create_users_and_accounts(self):
+        User.objects.create_user(username="taken@example.com", email="taken@example.com", password=self.password)
+        users, errors = UserService.register_many([
+            {"email": "a@example.com", "password": self.password},
+            {"email": "taken@example.com", "password": self.password},
+            {"email": "", "password": self.password},
+            {"email": "a@example.com", "password": self.password},
+            {"email": "b@example.com", "password": self.password},
+        ])
+
+        self.assertEqual([user.email for user in users], ["a@example.com", "b@example.com"])
+        self.assertEqual(errors, [
+            {"row": 1, "email": "taken@example.com", "detail": "Email already exists"},
+            {"row": 2, "email": "", "detail": "Email and password are required"},
+            {"row": 3, "email": "a@example.com", "detail": "Duplicate email in batch"},
+        ])
+        accounts = BankAccount.objects.filter(user__in=users)
+        self.assertEqual(len({account.account_number for account in accounts}), 2)
+        self.assertEqual({account.balance for account in accounts}, {Decimal("10000.00")})
+        self.assertEqual(UserService.login("b@example.com", self.password).user, users[1])
+
+    def test_when_email_taken_while_hashing_should_report_it(self):
+        pool = PasswordHasherPool(workers=0)
+        hash_many = pool.hash_many
+
+        def register_concurrently(passwords):
+            User.objects.create_user(username="b@example.com", email="b@example.com", password=self.password)
+            return hash_many(passwords)
+
+        with patch('bank.services.get_hasher_pool', return_value=pool), \
+                patch.object(pool, 'hash_many', side_effect=register_concurrently):
+            users, errors = UserService.register_many([
+                {"email": "a@example.com", "password": self.password},
+                {"email": "b@example.com", "password": self.password},
+            ])
+
+        self.assertEqual([user.email for user in users], ["a@example.com"])
+        self.assertEqual(errors, [{"row": 1, "email": "b@example.com", "detail": "Email already exists"}])
+
     def test_when_invalid_credentials_should_raise_exception(self):
         User.objects.create_user(username=self.email, email=self.email, password=self.password)
         with self.assertRaises(UserServiceException) as cm:
@@ -50,6 +101,61 @@ class UserServiceTests(TestCase):
         token = UserService.login(self.email, self.password)
         self.assertEqual(Token.objects.get(user__email=self.email), token)
 
+    def test_when_token_exists_should_login_with_single_query(self):
+        user = User.objects.create_user(username=self.email, email=self.email, password=self.password)
+        token = Token.objects.create(user=user)
+        with self.assertNumQueries(1):
+            self.assertEqual(UserService.login(self.email, self.password), token)
+
+    def test_when_user_inactive_should_raise_exception(self):
+        User.objects.create_user(username=self.email, email=self.email, password=self.password, is_active=False)
+        with self.assertRaises(UserServiceException) as cm:
+            UserService.login(self.email, self.password)
+        self.assertEqual(str(cm.exception), "Invalid credentials")
+
+    def test_when_hasher_cost_changed_should_rehash_password(self):
+        user = User.objects.create_user(username=self.email, email=self.email, password=self.password)
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            UserService.login(self.email, self.password)
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+            self.assertTrue(user.check_password(self.password))
+
+    def test_when_verifier_saturated_should_raise_busy_exception(self):
+        User.objects.create_user(username=self.email, email=self.email, password=self.password)
+        with patch('bank.services.get_verifier', return_value=PasswordVerifier(workers=0, max_pending=0)):
+            with self.assertRaises(UserServiceBusyException):
+                UserService.login(self.email, self.password)
+
+
+class PasswordVerifierTests(TestCase):
+    def test_check_in_worker_process_should_verify_password(self):
+        encoded = make_password("testpassword123")
+        verifier = PasswordVerifier(workers=1, max_pending=1)
+        try:
+            self.assertEqual(verifier.check("testpassword123", encoded), (True, None))
+            self.assertEqual(verifier.check("wrongpassword", encoded), (False, None))
+        finally:
+            verifier.executor.shutdown()
+
+
+    def test_when_worker_dies_should_replace_pool(self):
+        encoded = make_password("testpassword123")
+        verifier = PasswordVerifier(workers=1, max_pending=1)
+        try:
+            with self.assertRaises(BrokenProcessPool):
+                verifier.executor.submit(os._exit, 1).result()
+            self.assertEqual(verifier.check("testpassword123", encoded), (True, None))
+        finally:
+            verifier.executor.shutdown()
+
+    def test_when_pool_keeps_breaking_should_raise_busy(self):
+        verifier = PasswordVerifier(workers=1, max_pending=1)
+        try:
+            with patch("bank.passwords.check_password", kill_worker), self.assertRaises(PasswordVerifierBusy):
+                verifier.check("testpassword123", None)
+        finally:
+            verifier.executor.shutdown()
 
 class BankServiceTests(TestCase):
     def setUp(self):
@@ -135,6 +241,14 @@ class BankServiceTests(TestCase):
         fee = BankService.get_fee(Decimal('0.00'))
         self.assertEqual(fee, Decimal('5.00'))
 
+    def test_get_fee_rounds_half_up_to_cent(self):
+        self.assertEqual(BankService.get_fee(Decimal('300.10')), Decimal('7.50'))  # 7.5025
+        self.assertEqual(BankService.get_fee(Decimal('300.20')), Decimal('7.51'))  # 7.505
+
+    def test_get_fee_minor_uses_cents(self):
+        self.assertEqual(BankService.get_fee_minor(30020), 751)
+        self.assertEqual(BankService.get_fee_minor(100), 500)
+
     def test_when_transfer_amount_negative_should_raise_exception(self):
         receiver = UserService.register("receiver@example.com", self.password)
         receiver_account = BankAccount.objects.get(user=receiver)
@@ -179,3 +293,286 @@ class BankServiceTests(TestCase):
         self.assertEqual(sender_transactions[0].transaction_type, "debit")
         self.assertEqual(receiver_transactions[0].amount, transfer_amount)
         self.assertEqual(receiver_transactions[0].transaction_type, "credit")
+
+    def test_when_fee_has_fraction_of_cent_should_debit_rounded_total(self):
+        receiver = UserService.register("receiver@example.com", self.password)
+        receiver_account = BankAccount.objects.get(user=receiver)
+
+        BankService.transfer(self.user, receiver_account.account_number, Decimal("300.20"))
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("9692.29"))
+        self.assertEqual(self.account.transactions.get().amount, Decimal("307.71"))
+
+    def test_when_valid_transfer_should_update_rollups(self):
+        receiver = UserService.register("receiver@example.com", self.password)
+        receiver_account = BankAccount.objects.get(user=receiver)
+
+        BankService.transfer(self.user, receiver_account.account_number, Decimal("300.00"))
+        BankService.transfer(self.user, receiver_account.account_number, Decimal("100.00"))
+
+        today = timezone.now().date()
+        debit = TransactionRollup.objects.get(account=self.account, date=today, rollup_type='debit')
+        fee = TransactionRollup.objects.get(account=self.account, date=today, rollup_type='fee')
+        credit = TransactionRollup.objects.get(account=receiver_account, date=today, rollup_type='credit')
+        self.assertEqual((debit.total, debit.count), (Decimal("412.50"), 2))
+        self.assertEqual((fee.total, fee.count), (Decimal("12.50"), 2))
+        self.assertEqual((credit.total, credit.count), (Decimal("400.00"), 2))
+
+
+class SummaryServiceTests(TestCase):
+    def setUp(self):
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.account = BankAccount.objects.get(user=self.user)
+        for day, rollup_type, total in [
+            (date(2025, 9, 1), 'credit', Decimal("100.00")),
+            (date(2025, 9, 2), 'debit', Decimal("105.00")),
+            (date(2025, 9, 2), 'fee', Decimal("5.00")),
+            (date(2025, 10, 1), 'credit', Decimal("50.00")),
+        ]:
+            TransactionRollup.objects.create(account=self.account, date=day, rollup_type=rollup_type, total=total, count=1)
+
+    def test_when_day_granularity_should_return_daily_totals(self):
+        summary = BankService.get_summary(self.user, 'day')
+        self.assertEqual(summary, [
+            {'period': date(2025, 9, 1), 'credit': Decimal("100.00"), 'debit': Decimal("0.00"), 'fee': Decimal("0.00")},
+            {'period': date(2025, 9, 2), 'credit': Decimal("0.00"), 'debit': Decimal("105.00"), 'fee': Decimal("5.00")},
+            {'period': date(2025, 10, 1), 'credit': Decimal("50.00"), 'debit': Decimal("0.00"), 'fee': Decimal("0.00")},
+        ])
+
+    def test_when_month_granularity_should_return_monthly_totals(self):
+        summary = BankService.get_summary(self.user, 'month', date_to=date(2025, 9, 30))
+        self.assertEqual(summary, [
+            {'period': date(2025, 9, 1), 'credit': Decimal("100.00"), 'debit': Decimal("105.00"), 'fee': Decimal("5.00")},
+        ])
+
+
+class SettlementServiceTests(TestCase):
+    def setUp(self):
+        self.accounts = [
+            BankAccount.objects.get(user=UserService.register(f"user{i}@example.com", "testpassword123"))
+            for i in range(3)
+        ]
+
+    def instruction(self, sender, receiver, amount):
+        return {
+            'sender_account_number': self.accounts[sender].account_number,
+            'receiver_account_number': self.accounts[receiver].account_number,
+            'amount': Decimal(amount),
+        }
+
+    def test_when_cycle_exceeds_balances_should_settle_net_positions(self):
+        settled = BankService.settle([
+            self.instruction(0, 1, "9000.00"),
+            self.instruction(1, 2, "9000.00"),
+            self.instruction(2, 0, "9000.00"),
+            self.instruction(0, 1, "3000.00"),
+            self.instruction(1, 0, "3000.00"),
+        ])
+
+        self.assertEqual(settled, 5)
+        balances = [BankAccount.objects.get(pk=account.pk).balance for account in self.accounts]
+        self.assertEqual(balances, [Decimal("9700.00"), Decimal("9700.00"), Decimal("9775.00")])
+        self.assertEqual(Transaction.objects.filter(transaction_type='debit').count(), 5)
+        self.assertEqual(Transaction.objects.filter(transaction_type='credit').count(), 5)
+        self.assertEqual(
+            Transaction.objects.get(account=self.accounts[2], transaction_type='debit').amount, Decimal("9225.00")
+        )
+        rollup = TransactionRollup.objects.get(account=self.accounts[0], rollup_type='fee')
+        self.assertEqual((rollup.total, rollup.count), (Decimal("300.00"), 2))
+
+    def test_when_net_position_negative_should_reject_whole_batch(self):
+        with self.assertRaises(BankServiceException) as cm:
+            BankService.settle([
+                self.instruction(0, 1, "9000.00"),
+                self.instruction(0, 2, "1000.00"),
+            ])
+        self.assertEqual(str(cm.exception), f"Insufficient funds: {self.accounts[0].account_number}")
+        self.assertEqual(BankAccount.objects.get(pk=self.accounts[0].pk).balance, Decimal("10000.00"))
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_when_instruction_invalid_should_raise_exception_with_row(self):
+        valid = self.instruction(0, 1, "10.00")
+        for instruction, message in [
+            ({**valid, 'amount': "abc"}, "Instruction 1: invalid amount"),
+            ({**valid, 'amount': "NaN"}, "Instruction 1: invalid amount"),
+            ({**valid, 'amount': "Infinity"}, "Instruction 1: invalid amount"),
+            ({**valid, 'amount': "1e30"}, "Instruction 1: Amount is too large"),
+            ({**valid, 'amount': "1.005"}, "Instruction 1: Amount has more than 2 decimal places"),
+            ({**valid, 'amount': "10000000000.00"}, "Instruction 1: Amount is too large"),
+            ({**valid, 'amount': "-1.00"}, "Instruction 1: Amount must be positive"),
+            ({'amount': "1.00"}, "Instruction 1: sender_account_number is required"),
+            (["not", "a", "dict"], "Instruction 1: must be an object"),
+        ]:
+            with self.subTest(instruction=instruction):
+                with self.assertRaises(BankServiceException) as cm:
+                    BankService.settle([valid, instruction])
+                self.assertEqual(str(cm.exception), message)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_when_account_missing_should_raise_exception(self):
+        instruction = self.instruction(0, 1, "10.00")
+        instruction['receiver_account_number'] = "0000000000"
+        with self.assertRaises(BankServiceException) as cm:
+            BankService.settle([instruction])
+        self.assertEqual(str(cm.exception), "Sender or receiver account not found")
+
+
+class ScheduledTransferServiceTests(TestCase):
+    def setUp(self):
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.receiver = UserService.register("receiver@example.com", "testpassword123")
+        self.account = self.user.bank_account
+        self.receiver_account = self.receiver.bank_account
+
+    def schedule(self, interval, starts_at, amount="100.00"):
+        return BankService.schedule_transfer(
+            self.user, self.receiver_account.account_number, Decimal(amount), interval, starts_at
+        )
+
+    def schedule_missed(self, interval, age):
+        """A schedule that started ``age`` ago, as if the runner had been down since."""
+        scheduled = self.schedule(interval, timezone.now())
+        starts_at = timezone.now() - age
+        ScheduledTransfer.objects.filter(pk=scheduled.pk).update(starts_at=starts_at, next_run_at=starts_at)
+        return scheduled
+
+    def test_when_starts_in_past_should_raise_exception(self):
+        with self.assertRaises(BankServiceException) as cm:
+            self.schedule('daily', timezone.now() - timedelta(hours=1))
+        self.assertEqual(str(cm.exception), "Start time is in the past")
+
+    def test_when_starts_within_grace_period_should_schedule(self):
+        scheduled = self.schedule('daily', timezone.now() - timedelta(minutes=1))
+        self.assertTrue(scheduled.is_active)
+
+    def test_when_receiver_missing_should_raise_exception(self):
+        with self.assertRaises(BankServiceException) as cm:
+            BankService.schedule_transfer(self.user, "0000000000", Decimal("1.00"), "daily", timezone.now())
+        self.assertEqual(str(cm.exception), "Sender or receiver account not found")
+
+    def test_get_scheduled_run_monthly_should_clamp_to_month_end(self):
+        starts_at = timezone.datetime(2025, 1, 31, 9, 0, tzinfo=datetime_timezone.utc)
+        self.assertEqual(
+            BankService.get_scheduled_run(starts_at, 'monthly', 1),
+            timezone.datetime(2025, 2, 28, 9, 0, tzinfo=datetime_timezone.utc),
+        )
+        self.assertEqual(
+            BankService.get_scheduled_run(starts_at, 'monthly', 12),
+            timezone.datetime(2026, 1, 31, 9, 0, tzinfo=datetime_timezone.utc),
+        )
+
+    def test_when_runs_missed_should_catch_up(self):
+        scheduled = self.schedule_missed('daily', timedelta(days=2, hours=1))
+
+        while BankService.run_scheduled_transfers(10):
+            pass
+
+        scheduled.refresh_from_db()
+        self.assertEqual(scheduled.run_count, 3)
+        self.assertGreater(scheduled.next_run_at, timezone.now())
+        self.assertEqual(self.receiver_account.transactions.count(), 3)
+
+    def test_when_many_runs_missed_should_run_each_once_per_claim(self):
+        scheduled = self.schedule_missed('daily', timedelta(days=5, hours=1))
+
+        self.assertEqual(BankService.run_scheduled_transfers(10), 1)
+        scheduled.refresh_from_db()
+        self.assertEqual(scheduled.run_count, 1)
+        while BankService.run_scheduled_transfers(10):
+            pass
+
+        scheduled.refresh_from_db()
+        self.assertEqual(scheduled.run_count, 6)
+        self.assertEqual(scheduled.next_run_at, scheduled.starts_at + timedelta(days=6))
+        self.assertEqual(scheduled.last_error, "")
+        self.assertEqual(self.receiver_account.transactions.filter(transaction_type='credit').count(), 6)
+
+    def test_when_once_should_deactivate_after_run(self):
+        scheduled = self.schedule('once', timezone.now())
+        self.assertEqual(BankService.run_scheduled_transfers(10), 1)
+        self.assertEqual(BankService.run_scheduled_transfers(10), 0)
+        scheduled.refresh_from_db()
+        self.assertFalse(scheduled.is_active)
+
+    def test_should_advance_schedule_before_running_transfer(self):
+        scheduled = self.schedule('weekly', timezone.now())
+        claimed = []
+        transfer = BankService.transfer
+
+        def record_claim(*args):
+            claimed.append(ScheduledTransfer.objects.values_list('run_count', 'next_run_at').get(pk=scheduled.pk))
+            return transfer(*args)
+
+        with patch.object(BankService, 'transfer', side_effect=record_claim):
+            BankService.run_scheduled_transfers(10)
+
+        self.assertEqual(claimed, [(1, scheduled.starts_at + timedelta(weeks=1))])
+
+    def test_when_transfer_hits_database_error_should_record_it_and_continue(self):
+        failing = self.schedule('weekly', timezone.now())
+        succeeding = self.schedule('weekly', timezone.now())
+        errors = iter([OperationalError('deadlock detected')])
+        transfer = BankService.transfer
+
+        def flaky_transfer(*args):
+            if error := next(errors, None):
+                raise error
+            return transfer(*args)
+
+        with patch.object(BankService, 'transfer', side_effect=flaky_transfer):
+            self.assertEqual(BankService.run_scheduled_transfers(10), 2)
+
+        failing.refresh_from_db()
+        succeeding.refresh_from_db()
+        self.assertEqual(failing.last_error, "Database error: deadlock detected")
+        self.assertEqual(failing.run_count, 1)
+        self.assertEqual(succeeding.last_error, "")
+        self.assertIsNotNone(succeeding.last_run_at)
+        self.assertEqual(self.receiver_account.transactions.filter(transaction_type='credit').count(), 1)
+
+    def test_when_run_fails_should_record_error_and_advance(self):
+        scheduled = self.schedule('weekly', timezone.now(), amount="20000.00")
+        BankService.run_scheduled_transfers(10)
+        scheduled.refresh_from_db()
+        self.assertEqual(scheduled.last_error, "Insufficient funds")
+        self.assertEqual(scheduled.next_run_at, scheduled.starts_at + timedelta(weeks=1))
+        self.assertFalse(Transaction.objects.exists())
+
+
+@override_settings(
+    VELOCITY_LIMITS={'standard': '500.00'}, VELOCITY_WINDOW_SECONDS=3600, VELOCITY_BUCKET_SECONDS=60
+)
+class VelocityLimitTests(TestCase):
+    def setUp(self):
+        self.user = UserService.register("test@example.com", "testpassword123")
+        self.receiver = UserService.register("receiver@example.com", "testpassword123")
+        self.account = self.user.bank_account
+        self.now = timezone.datetime(2025, 9, 30, 12, 0, 0, tzinfo=datetime_timezone.utc)
+
+    def transfer(self, amount, now):
+        with patch('bank.services.timezone.now', return_value=now):
+            BankService.transfer(self.user, self.receiver.bank_account.account_number, Decimal(amount))
+
+    def test_when_window_limit_exceeded_should_raise_exception(self):
+        self.transfer("300.00", self.now)
+        self.transfer("200.00", self.now + timedelta(minutes=30))
+        with self.assertRaises(BankServiceException) as cm:
+            self.transfer("0.01", self.now + timedelta(minutes=59))
+        self.assertEqual(str(cm.exception), "Transfer limit exceeded")
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("9487.50"))
+
+    def test_when_buckets_leave_window_should_allow_transfer(self):
+        self.transfer("300.00", self.now)
+        self.transfer("200.00", self.now + timedelta(minutes=30))
+        self.transfer("250.00", self.now + timedelta(minutes=60))
+        self.assertEqual(self.account.velocity_buckets.count(), 2)
+        self.assertEqual(
+            set(self.account.velocity_buckets.values_list('total', flat=True)), {Decimal("250.00"), Decimal("200.00")}
+        )
+
+    def test_when_tier_unlimited_should_skip_check(self):
+        BankAccount.objects.filter(pk=self.account.pk).update(tier='business')
+        self.transfer("1000.00", self.now)
+        self.assertFalse(VelocityBucket.objects.exists())
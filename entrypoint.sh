@@ -2,4 +2,4 @@
 set -e
 
 python manage.py migrate
-python manage.py runserver 0.0.0.0:8000
+exec uvicorn simple_bank.asgi:application --host 0.0.0.0 --port 8000
@@ -43,6 +43,35 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Server-Sent Events feed of new transactions (seconds / rows).
+TRANSACTION_STREAM_KEEPALIVE = 15
+TRANSACTION_STREAM_POLL_INTERVAL = 2
+TRANSACTION_STREAM_BATCH_SIZE = 100
+
+# Outgoing transfer limits per account tier over a rolling window, counted in fixed-size time buckets.
+# Tiers missing from VELOCITY_LIMITS are unlimited.
+VELOCITY_LIMITS = {
+    'standard': '5000.00',
+    'premium': '50000.00',
+}
+VELOCITY_WINDOW_SECONDS = 24 * 60 * 60
+VELOCITY_BUCKET_SECONDS = 5 * 60
+
+# Scheduled transfers may start at most this far in the past.
+SCHEDULED_TRANSFER_START_GRACE_SECONDS = 5 * 60
+
+# Admin change lists show the planner's row estimate instead of an exact count when it is larger than this.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000
+
+# Admission control for write endpoints. State lives in the default cache (local memory unless CACHES is set).
+# Each client token refills ADMISSION_RATE requests per second up to ADMISSION_BURST, and an account may have
+# at most ADMISSION_MAX_IN_FLIGHT transfers running. Rejected requests get 429 with Retry-After.
+ADMISSION_RATE = 5
+ADMISSION_BURST = 20
+ADMISSION_MAX_IN_FLIGHT = 2
+ADMISSION_IN_FLIGHT_TIMEOUT = 60
+ADMISSION_RETRY_AFTER = 1
+
 ROOT_URLCONF = "simple_bank.urls"
 
 TEMPLATES = [
@@ -66,6 +95,28 @@ DATABASES = {
     "default": dj_database_url.config(default=os.getenv('DATABASE_URL'))
 }
 
+PASSWORD_HASHERS = [
+    "bank.passwords.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+# Stored hashes with a different count are re-hashed on the next successful login.
+# Pick it with `python manage.py benchmark_hasher`.
+PASSWORD_PBKDF2_ITERATIONS = 1_000_000
+
+# Login password checks run in this many worker processes (0 runs them in the request thread).
+# Logins beyond LOGIN_MAX_PENDING concurrent checks are refused with 503 and Retry-After.
+LOGIN_PASSWORD_WORKERS = 0
+LOGIN_MAX_PENDING = 32
+LOGIN_RETRY_AFTER = 1
+
+# Maximum rows accepted by POST /api/register/batch/.
+REGISTER_BATCH_MAX_SIZE = 1000
+# Bulk registrations hash passwords in this many worker processes, separate from the login pool (0 hashes inline).
+REGISTER_HASH_WORKERS = 0
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},